@@ -161,7 +161,7 @@ def process_post_image_pipeline_task(post_id, image_bytes_b64):
         output_path = f"processed_images/{post.id}.jpg"
         # In a real app: image.save(output_path, 'JPEG')
         post.processed_image_path = output_path
-        post.save()
+        post.save(update_fields=['processed_image_path'])
         logger.info(f"Saved processed image for Post ID: {post.id} to {output_path}")
 
         return {"status": "success", "path": output_path}
@@ -128,7 +128,7 @@ def run_image_processing_pipeline(self, job_id: uuid.UUID, image_b64: str):
         with transaction.atomic():
             job.status = JobStatus.RUNNING.name
             job.celery_task_id = self.request.id
-            job.save()
+            job.save(update_fields=['status', 'celery_task_id', 'updated_at'])
         
         post = Post.objects.get(id=job.related_object_id)
         import base64
@@ -140,12 +140,12 @@ def run_image_processing_pipeline(self, job_id: uuid.UUID, image_b64: str):
         with transaction.atomic():
             job.status = JobStatus.SUCCESS.name
             job.result_metadata = {'path': result_path}
-            job.save()
+            job.save(update_fields=['status', 'result_metadata', 'updated_at'])
     except Exception as e:
         with transaction.atomic():
             job.status = JobStatus.FAILED.name
             job.result_metadata = {'error': str(e)}
-            job.save()
+            job.save(update_fields=['status', 'result_metadata', 'updated_at'])
         raise
 
 @celery_app.task
@@ -9,7 +9,7 @@ import os
 import uuid
 from datetime import timedelta
 from enum import Enum
-from typing import Any, Dict, Type
+from typing import Any, Dict, List, Type
 
 from django.db import models
 from django.conf import settings
@@ -25,12 +25,21 @@ def configure_django():
         DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
         CELERY_BROKER_URL='redis://localhost:6379/0',
         CELERY_RESULT_BACKEND='redis://localhost:6379/0',
+        # Image chain stages are slow and uneven; hand out one task at a time and
+        # only ack once finished so a crashed worker's stage is redelivered.
+        # Run workers with: celery -A myproject worker -O fair --prefetch-multiplier=1 -c 8
+        CELERY_WORKER_PREFETCH_MULTIPLIER=1,
+        CELERY_TASK_ACKS_LATE=True,
+        # msgpack carries raw image bytes between chain stages, so no base64 step.
+        CELERY_TASK_SERIALIZER='msgpack',
+        CELERY_RESULT_SERIALIZER='msgpack',
+        CELERY_ACCEPT_CONTENT=['msgpack', 'json'],
     )
     import django
     django.setup()
 
 # --- Celery App Definition (myproject/celery.py) ---
-from celery import Celery, Task, chain
+from celery import Celery, Task, chain, chord, group
 from celery.schedules import crontab
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
@@ -75,45 +84,113 @@ class LoggingTask(Task):
     retry_jitter=True,         # Adds randomness to avoid thundering herd
     max_retries=5
 )
-def send_user_email(user_id: uuid.UUID, subject: str, message: str) -> None:
+def send_user_email(user_id: str, subject: str, message: str) -> None:
     user = User.objects.get(pk=user_id)
     print(f"Attempting to send email to {user.email}")
     django_send_mail(subject, message, 'system@example.com', [user.email])
 
 # --- Tasks (core/tasks/image_tasks.py) ---
 from PIL import Image, ImageDraw
-import io, base64
+from django.core.cache import cache
+import cv2
+import numpy as np
+import io, hashlib
+
+# The first entry is the primary (Open Graph) image stored on the Post.
+IMAGE_VARIANT_SIZES: List[tuple[int, int]] = [(1200, 630), (300, 300), (64, 64)]
+WATERMARK_POSITION: tuple[int, int] = (20, 20)
+WATERMARK_CACHE_TIMEOUT: int = 3600
+# libjpeg can decode a JPEG straight to 1/2, 1/4 or 1/8 of its size.
+JPEG_REDUCED_READS: List[tuple[int, int]] = [
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+]
+
+def _render_watermark(text: str) -> np.ndarray:
+    # Rasterize the text once onto a transparent layer sized to its bounding box.
+    # Returned as a BGRA array to line up with OpenCV's channel order.
+    _, _, width, height = ImageDraw.Draw(Image.new('RGBA', (1, 1))).textbbox((0, 0), text)
+    layer = Image.new('RGBA', (max(width, 1), max(height, 1)), (0, 0, 0, 0))
+    ImageDraw.Draw(layer).text((0, 0), text, fill=(255, 255, 255, 178))
+    return np.ascontiguousarray(np.asarray(layer)[..., [2, 1, 0, 3]])
+
+def blend_layer(base: np.ndarray, layer: np.ndarray, position: tuple[int, int]) -> None:
+    # Vectorized in-place alpha blend, clipped to the base image bounds.
+    x, y = position
+    height = min(layer.shape[0], base.shape[0] - y)
+    width = min(layer.shape[1], base.shape[1] - x)
+    if height <= 0 or width <= 0:
+        return
+    overlay = layer[:height, :width].astype(np.uint16)
+    alpha = overlay[..., 3:4]
+    region = base[y:y + height, x:x + width]
+    region[...] = ((overlay[..., :3] * alpha + region.astype(np.uint16) * (255 - alpha)) // 255).astype(np.uint8)
+
+def decode_image(image_bytes: bytes, size: tuple[int, int] | None = None) -> np.ndarray:
+    # When the result will be shrunk to fit `size`, JPEGs are decoded at the
+    # largest reduction that still leaves at least 2x the target resolution
+    # for INTER_AREA to work from. Only the header is parsed to get the size.
+    flag = cv2.IMREAD_COLOR
+    if size is not None:
+        try:
+            header = Image.open(io.BytesIO(image_bytes))
+        except OSError:
+            header = None
+        if header is not None and header.format == 'JPEG':
+            scale = min(header.width // (size[0] * 2), header.height // (size[1] * 2))
+            flag = next((reduced for factor, reduced in JPEG_REDUCED_READS if factor <= scale), flag)
+    image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), flag)
+    if image is None:
+        raise ValueError("Could not decode image payload")
+    return image
+
+def get_watermark_layer(text: str) -> np.ndarray:
+    key = f"wm:{hashlib.md5(text.encode('utf-8')).hexdigest()}"
+    return cache.get_or_set(key, lambda: _render_watermark(text), WATERMARK_CACHE_TIMEOUT)
 
 @app.task(base=LoggingTask)
-def resize_image(image_b64: str, size: tuple[int, int] = (1200, 630)) -> str:
-    image_bytes = base64.b64decode(image_b64)
-    image = Image.open(io.BytesIO(image_bytes))
-    image.thumbnail(size)
-    
-    buffer = io.BytesIO()
-    image.save(buffer, format='JPEG')
-    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+def resize_image(image_bytes: bytes, size: tuple[int, int] = (1200, 630)) -> bytes:
+    # OpenCV (bundled libjpeg-turbo, SIMD resize) handles decode/scale/encode.
+    image = decode_image(image_bytes, size)
+
+    # Same semantics as PIL's thumbnail(): keep aspect ratio, never upscale.
+    height, width = image.shape[:2]
+    scale = min(size[0] / width, size[1] / height)
+    if scale < 1:
+        new_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        image = cv2.resize(image, new_size, interpolation=cv2.INTER_AREA)
+
+    ok, buffer = cv2.imencode('.jpg', image)
+    if not ok:
+        raise ValueError("Could not encode resized image")
+    return buffer.tobytes()
 
 @app.task(base=LoggingTask)
-def apply_watermark(image_b64: str, text: str) -> str:
-    image_bytes = base64.b64decode(image_b64)
-    image = Image.open(io.BytesIO(image_bytes))
-    draw = ImageDraw.Draw(image)
-    draw.text((20, 20), text, fill="rgba(255, 255, 255, 0.7)")
-    
-    buffer = io.BytesIO()
-    image.save(buffer, format='JPEG')
-    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+def apply_watermark(image_bytes: bytes, text: str) -> bytes:
+    image = decode_image(image_bytes)
+    blend_layer(image, get_watermark_layer(text), WATERMARK_POSITION)
+
+    ok, buffer = cv2.imencode('.jpg', image)
+    if not ok:
+        raise ValueError("Could not encode watermarked image")
+    return buffer.tobytes()
 
 @app.task(base=LoggingTask)
-def store_final_image(image_b64: str, post_id: uuid.UUID) -> Dict[str, str]:
+def store_final_image(image_bytes: bytes, post_id: str, variant: tuple[int, int] = IMAGE_VARIANT_SIZES[0]) -> Dict[str, str]:
     # In a real app, this would upload to S3 or another storage service
     # and return the public URL.
-    final_url = f"https://cdn.example.com/images/{post_id}.jpg"
-    post = Post.objects.get(pk=post_id)
-    post.final_image_url = final_url
-    post.save(update_fields=['final_image_url'])
-    return {'post_id': str(post_id), 'url': final_url}
+    width, height = variant
+    final_url = f"https://cdn.example.com/images/{post_id}_{width}x{height}.jpg"
+    return {'post_id': str(post_id), 'variant': f"{width}x{height}", 'url': final_url}
+
+@app.task(base=LoggingTask)
+def finalize_post_images(results: List[Dict[str, str]], post_id: str) -> Dict[str, Any]:
+    # Chord callback: runs once every variant has been stored. Results arrive
+    # in IMAGE_VARIANT_SIZES order, so the first one is the primary image.
+    urls = {result['variant']: result['url'] for result in results}
+    Post.objects.filter(pk=post_id).update(final_image_url=results[0]['url'])
+    return {'post_id': post_id, 'urls': urls}
 
 # --- Tasks (core/tasks/user_tasks.py) ---
 from django.utils import timezone
@@ -137,11 +214,20 @@ app.conf.beat_schedule = {
 app.autodiscover_tasks(packages=['__main__'])
 
 # --- Views (core/views.py) ---
+def _make_dummy_image() -> bytes:
+    img = Image.new('RGB', (1920, 1080), color='purple')
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+# Built once per process rather than on every request.
+DUMMY_IMAGE_BYTES: bytes = _make_dummy_image()
+
 class UserSignupView(View):
     def post(self, request, *args, **kwargs) -> JsonResponse:
         user = User.objects.create(email=f'user-{uuid.uuid4()}@example.com')
         send_user_email.delay(
-            user_id=user.id,
+            user_id=str(user.id),  # msgpack has no UUID type
             subject="Welcome!",
             message=f"Hello {user.email}, welcome to our service."
         )
@@ -152,17 +238,20 @@ class PostCreateView(View):
         user, _ = User.objects.get_or_create(email='author@example.com')
         post = Post.objects.create(user=user, title="My Awesome Post")
         
-        # Create dummy image
-        img = Image.new('RGB', (1920, 1080), color='purple')
-        buffer = io.BytesIO()
-        img.save(buffer, format='JPEG')
-        image_b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        
-        # Define the image processing pipeline using a chain
-        pipeline = chain(
-            resize_image.s(image_b64),
-            apply_watermark.s(f"© {user.email}"),
-            store_final_image.s(post_id=post.id)
+        # Each size variant is an independent chain; the group lets the workers
+        # build them in parallel and the chord callback records the results.
+        post_id = str(post.id)
+        watermark_text = f"© {user.email}"
+        pipeline = chord(
+            group(
+                chain(
+                    resize_image.s(DUMMY_IMAGE_BYTES, size=size),
+                    apply_watermark.s(watermark_text),
+                    store_final_image.s(post_id=post_id, variant=size)
+                )
+                for size in IMAGE_VARIANT_SIZES
+            ),
+            finalize_post_images.s(post_id=post_id)
         )
         task_result = pipeline.apply_async()
         
@@ -22,6 +22,13 @@ def configure_django():
         DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
         CELERY_BROKER_URL='redis://localhost:6379/0',
         CELERY_RESULT_BACKEND='redis://localhost:6379/0',
+        # Fair dispatch for the image chain: celery -A myproject worker -O fair -c 8
+        CELERY_WORKER_PREFETCH_MULTIPLIER=1,
+        CELERY_TASK_ACKS_LATE=True,
+        # Raw image bytes go over the wire as msgpack bin, no base64 needed
+        CELERY_TASK_SERIALIZER='msgpack',
+        CELERY_RESULT_SERIALIZER='msgpack',
+        CELERY_ACCEPT_CONTENT=['msgpack', 'json'],
         CELERY_BEAT_SCHEDULE={
             'daily-user-cleanup': {
                 'task': '__main__.cleanup_users',
@@ -59,9 +66,33 @@ class Post(models.Model):
 
 # --- Tasks (core/tasks.py) ---
 from PIL import Image, ImageDraw
-import io, base64
+import cv2
+import numpy as np
+import io, hashlib
+from django.core.cache import cache
 from django.utils import timezone
 
+def _render_wm(text):
+    _, _, w, h = ImageDraw.Draw(Image.new('RGBA', (1, 1))).textbbox((0, 0), text)
+    layer = Image.new('RGBA', (max(w, 1), max(h, 1)), (0, 0, 0, 0))
+    ImageDraw.Draw(layer).text((0, 0), text, fill='white')
+    return np.asarray(layer)[..., [2, 1, 0, 3]]  # BGRA, to match cv2
+
+def blend(base, layer, x, y):
+    """Alpha-blends an RGBA-style layer into base in place with numpy."""
+    h, w = min(layer.shape[0], base.shape[0] - y), min(layer.shape[1], base.shape[1] - x)
+    if h <= 0 or w <= 0:
+        return
+    wm = layer[:h, :w].astype(np.uint16)
+    a = wm[..., 3:4]
+    roi = base[y:y + h, x:x + w]
+    roi[...] = ((wm[..., :3] * a + roi.astype(np.uint16) * (255 - a)) // 255).astype(np.uint8)
+
+def get_watermark_layer(text):
+    """Watermark text is rasterized once per author and reused from the cache."""
+    key = f"wm:{hashlib.md5(text.encode()).hexdigest()}"
+    return cache.get_or_set(key, lambda: _render_wm(text), 3600)
+
 @shared_task(autoretry_for=(Exception,), retry_kwargs={'max_retries': 5, 'countdown': 30})
 def notify(user_id, subject, message):
     """Sends an email, retries on any failure."""
@@ -70,26 +101,49 @@ def notify(user_id, subject, message):
     django_send_mail(subject, message, 'noreply@example.com', [user.email])
     return {'status': 'ok', 'user_id': str(user_id)}
 
+# libjpeg can decode at 1/8, 1/4 or 1/2 scale; like Image.draft(), pick the
+# largest reduction that still leaves twice the target for the final resize.
+REDUCED_READS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+def decode(img_bytes, width=None, height=None):
+    flag = cv2.IMREAD_COLOR
+    if width is not None:
+        try:
+            header = Image.open(io.BytesIO(img_bytes))  # parses the header only
+        except OSError:
+            header = None
+        if header is not None and header.format == 'JPEG':
+            scale = min(header.width // (width * 2), header.height // (height * 2))
+            flag = next((f for factor, f in REDUCED_READS if factor <= scale), flag)
+    img = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), flag)
+    if img is None:
+        raise ValueError("Could not decode image payload")
+    return img
+
+def encode_png(img):
+    ok, buf = cv2.imencode('.png', img)
+    if not ok:
+        raise ValueError("Could not encode image")
+    return buf.tobytes()
+
 # Image processing pipeline is broken into small, chainable tasks
 @shared_task
-def resize(img_b64, width=800, height=800):
-    img = Image.open(io.BytesIO(base64.b64decode(img_b64)))
-    img.thumbnail((width, height))
-    buf = io.BytesIO()
-    img.save(buf, format='PNG')
-    return base64.b64encode(buf.getvalue()).decode('utf-8')
+def resize(img_bytes, width=800, height=800):
+    img = decode(img_bytes, width, height)
+    h, w = img.shape[:2]
+    scale = min(width / w, height / h)
+    if scale < 1:  # thumbnail() semantics: keep aspect ratio, never upscale
+        img = cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+    return encode_png(img)
 
 @shared_task
-def watermark(img_b64, text):
-    img = Image.open(io.BytesIO(base64.b64decode(img_b64)))
-    draw = ImageDraw.Draw(img)
-    draw.text((10, 10), text, fill='white')
-    buf = io.BytesIO()
-    img.save(buf, format='PNG')
-    return base64.b64encode(buf.getvalue()).decode('utf-8')
+def watermark(img_bytes, text):
+    img = decode(img_bytes)
+    blend(img, get_watermark_layer(text), 10, 10)
+    return encode_png(img)
 
 @shared_task
-def save_img(img_b64, post_id):
+def save_img(img_bytes, post_id):
     # Simulate saving to a CDN and updating the Post model
     url = f"https://cdn.example.com/{post_id}.png"
     Post.objects.filter(id=post_id).update(image_url=url)
@@ -104,10 +158,18 @@ def cleanup_users():
     return f"Deactivated {num_deleted} users."
 
 # --- Views (core/views.py) ---
+def _make_dummy():
+    img = Image.new('RGB', (1024, 768), color='green')
+    buf = io.BytesIO()
+    img.save(buf, format='PNG')
+    return buf.getvalue()
+
+DUMMY_IMAGE_BYTES = _make_dummy()  # encoded once per process
+
 class UserSignupView(View):
     def post(self, request, *args, **kwargs):
         user = User.objects.create(email=f'user.{uuid.uuid4().hex[:6]}@example.com')
-        notify.delay(user.id, "Welcome!", "Thanks for signing up.")
+        notify.delay(str(user.id), "Welcome!", "Thanks for signing up.")
         return JsonResponse({'status': 'user created'}, status=201)
 
 class PostCreateView(View):
@@ -115,17 +177,11 @@ class PostCreateView(View):
         user, _ = User.objects.get_or_create(email='author@example.com')
         post = Post.objects.create(user=user, title="Chaining Tasks")
 
-        # Create dummy image
-        img = Image.new('RGB', (1024, 768), color='green')
-        buf = io.BytesIO()
-        img.save(buf, format='PNG')
-        img_b64 = base64.b64encode(buf.getvalue()).decode('utf-8')
-
         # Create and run the processing pipeline using a chain
         pipeline = chain(
-            resize.s(img_b64),
+            resize.s(DUMMY_IMAGE_BYTES),
             watermark.s(f"Post by {user.email}"),
-            save_img.s(post.id)
+            save_img.s(str(post.id))
         )
         result = pipeline.apply_async()
 
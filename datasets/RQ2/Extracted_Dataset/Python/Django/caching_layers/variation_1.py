@@ -4,6 +4,8 @@ import enum
 import time
 from unittest.mock import MagicMock
 
+import msgpack
+
 # --- Django Framework Mock Setup ---
 # This setup simulates a Django environment for standalone execution.
 from django.conf import settings
@@ -103,6 +105,38 @@ class PostManagerMock:
 Post.objects = PostManagerMock()
 
 
+# --- Cache Serialization: serializers.py ---
+# LocMemCache pickles every value it stores. Posts are packed into msgpack
+# rows first: UUIDs as their 16 raw bytes and enums by value. The row is a
+# fraction of the size of a pickled Post, and pickling the resulting bytes
+# object is little more than a copy.
+
+def _post_to_row(post: Post) -> tuple:
+    return (post.id.bytes, post.user_id.bytes, post.title, post.content, post.status.value)
+
+def _post_from_row(row) -> Post:
+    id_bytes, user_id_bytes, title, content, status = row
+    return Post(
+        id=uuid.UUID(bytes=id_bytes),
+        user_id=uuid.UUID(bytes=user_id_bytes),
+        title=title,
+        content=content,
+        status=PostStatus(status),
+    )
+
+def pack_post(post: Post) -> bytes:
+    return msgpack.packb(_post_to_row(post))
+
+def unpack_post(data: bytes) -> Post:
+    return _post_from_row(msgpack.unpackb(data))
+
+def pack_posts(posts: list[Post]) -> bytes:
+    return msgpack.packb([_post_to_row(post) for post in posts])
+
+def unpack_posts(data: bytes) -> list[Post]:
+    return [_post_from_row(row) for row in msgpack.unpackb(data)]
+
+
 # --- Service Layer: services.py ---
 # This developer prefers a clear separation of concerns using a service layer.
 
@@ -121,9 +155,9 @@ class PostService:
         
         # 1. Attempt to get from cache
         cached_post = cache.get(cache_key)
-        if cached_post:
+        if cached_post is not None:
             print(f"CACHE HIT for key: {cache_key}")
-            return cached_post
+            return unpack_post(cached_post)
         
         print(f"CACHE MISS for key: {cache_key}")
         
@@ -132,7 +166,7 @@ class PostService:
         
         # 3. Set the result in the cache for future requests
         # Time-based expiration: 1 hour
-        cache.set(cache_key, post, timeout=3600)
+        cache.set(cache_key, pack_post(post), timeout=3600)
         print(f"CACHE SET for key: {cache_key}")
         
         return post
@@ -144,13 +178,13 @@ class PostService:
         cached_posts = cache.get(cache_key)
         if cached_posts is not None: # Check for None to handle empty list caching
             print(f"CACHE HIT for key: {cache_key}")
-            return cached_posts
+            return unpack_posts(cached_posts)
 
         print(f"CACHE MISS for key: {cache_key}")
         posts = Post.objects.filter(user_id=user_id)
         
         # Time-based expiration: 10 minutes
-        cache.set(cache_key, posts, timeout=600)
+        cache.set(cache_key, pack_posts(posts), timeout=600)
         print(f"CACHE SET for key: {cache_key}")
 
         return posts
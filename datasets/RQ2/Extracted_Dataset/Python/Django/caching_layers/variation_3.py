@@ -1,10 +1,12 @@
 import uuid
 import datetime
+from collections import defaultdict
 import enum
 import time
-import functools
-import hashlib
 import json
+import logging
+
+import xxhash
 
 # --- Django Framework Mock Setup ---
 from django.conf import settings
@@ -14,7 +16,10 @@ if not settings.configured:
     settings.configure(
         CACHES={
             'default': {
-                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                # Stores live objects (no pickling) and skips key validation.
+                # Cached values are shared, so treat them as read-only and
+                # copy.copy() before mutating.
+                'BACKEND': 'lrucache_backend.LRUObjectCache',
                 'LOCATION': 'decorator-cache-space',
                 'OPTIONS': {
                     'MAX_ENTRIES': 2000,
@@ -31,9 +36,12 @@ if not settings.configured:
     )
 
 cache = caches['default']
+logger = logging.getLogger(__name__)
 
 # --- Mock Database and Models ---
-MOCK_DB = {'posts': {}}
+# 'by_user_status' is a secondary index: (user_id, status) -> post ids. The
+# buckets are dicts used as ordered sets, so posts come back in insertion order.
+MOCK_DB = {'posts': {}, 'by_user_status': defaultdict(dict)}
 
 class PostStatus(enum.Enum):
     DRAFT = "DRAFT"
@@ -47,48 +55,189 @@ class Post:
         self.content = content
         self.status = status
 
+def save_post(post: Post):
+    """Inserts a post into the mock DB and indexes it by (user_id, status)."""
+    MOCK_DB['posts'][post.id] = post
+    MOCK_DB['by_user_status'][(post.user_id, post.status)][post.id] = None
+
+def set_post_status(post_id: uuid.UUID, status: PostStatus):
+    """Changes a post's status and moves it to the matching index bucket."""
+    post = MOCK_DB['posts'][post_id]
+    MOCK_DB['by_user_status'][(post.user_id, post.status)].pop(post_id, None)
+    post.status = status
+    MOCK_DB['by_user_status'][(post.user_id, status)][post_id] = None
+
 # --- Caching Utilities: cache_utils.py ---
 # This developer prefers reusable decorators and utility functions.
 
+# Keys only need to be well distributed, not collision-resistant against an
+# attacker, so a fast non-cryptographic 64-bit hash is enough.
+xxh64 = xxhash.xxh64
+xxh64_intdigest = xxhash.xxh64_intdigest
+
+def _short_key_part(value):
+    """Returns a compact literal key part for UUIDs, ints and short strings, else None."""
+    # The leading type tag keeps f(5) and f("5"), or a UUID and its hex
+    # string, on different keys.
+    if isinstance(value, uuid.UUID):
+        return 'u' + value.hex
+    # bool is an int subclass; True must not share 1's key.
+    if isinstance(value, int) and not isinstance(value, bool):
+        return f'i{value}'
+    if isinstance(value, str) and len(value) <= 32 and value.isascii() and value.isalnum():
+        return 's' + value
+    return None
+
+def generate_cache_key_with_prefix(prefix, args, kwargs, version=None):
+    """Appends the argument part of a cache key to a precomputed per-function prefix."""
+    key = _argument_key(prefix, args, kwargs)
+    # '@' appears in neither part of the key above, so the suffix is unambiguous.
+    return key if version is None else f"{key}@v{version}"
+
+def _argument_key(prefix, args, kwargs):
+    # Fast path: a single scalar argument is already a short unique key, so use
+    # it verbatim. The '=' can never appear in a hex digest, so these keys
+    # cannot collide with the hashed ones below.
+    if len(args) + len(kwargs) == 1:
+        name, value = next(iter(kwargs.items())) if kwargs else ('0', args[0])
+        part = _short_key_part(value)
+        if part is not None:
+            return f"{prefix}{name}={part}"
+
+    # Stream each argument into the hasher instead of building one big string.
+    # The NUL separators keep ("ab", "c") and ("a", "bc") apart.
+    hasher = xxh64()
+    update = hasher.update
+    for arg in args:
+        update(repr(arg).encode())
+        update(b'\x00')
+    if kwargs:
+        # XOR of per-pair digests is independent of keyword order, so there is
+        # no need to sort. xxh64 is used instead of hash() because str hashes
+        # are randomized per process and the keys must match across workers.
+        acc = 0
+        for name, value in kwargs.items():
+            acc ^= xxh64_intdigest(f"{name}={value!r}".encode())
+        update(acc.to_bytes(8, 'little'))
+    return prefix + hasher.hexdigest()
+
 def generate_cache_key(func, *args, **kwargs):
     """Creates a deterministic cache key from a function and its arguments."""
-    # Use a stable representation of args and kwargs
-    arg_representation = str(args) + str(sorted(kwargs.items()))
-    # Hash the representation to keep key length manageable
-    arg_hash = hashlib.sha256(arg_representation.encode()).hexdigest()
-    return f"func_cache:{func.__name__}:{arg_hash}"
+    return generate_cache_key_with_prefix(f"func_cache:{func.__name__}:", args, kwargs)
+
+# --- Version Namespaces ---
+# Cached results derived from an entity have that entity's current version in
+# their key. A write bumps the version once, which orphans every derived entry
+# at the same time; the orphans simply age out of the LRU.
+
+def namespace_version(namespace):
+    """Returns the current version for a namespace such as 'post:<id>'."""
+    # Seeded from the clock rather than 1: if the version key is evicted, the
+    # new seed cannot match a version that older entries were stored under.
+    return cache.get_or_set(f"v:{namespace}", time.time_ns, timeout=None)
+
+def bump_namespace(namespace):
+    """Invalidates everything cached under a namespace in O(1)."""
+    try:
+        cache.incr(f"v:{namespace}")
+    except ValueError:
+        # No version stored, so nothing can be cached under it either; the
+        # next read seeds a fresh one.
+        pass
+
+# Negative results (None) are cached too, but for at most this many seconds.
+NEGATIVE_CACHE_TIMEOUT = 60
 
-def cache_result(timeout):
+# _MISS is only ever compared locally. _NULL is stored in the cache, so it
+# pickles by reference and keeps its identity with pickling backends as well.
+_MISS = object()
+
+class _NullType:
+    def __reduce__(self):
+        return '_NULL'
+
+_NULL = _NullType()
+
+# Placeholder stored by guard-mode wrappers; only its presence matters.
+_RUNNING = 1
+
+def cache_result(timeout, namespace=None, guard=False):
     """
     A decorator for caching the result of a function.
     Implements the cache-aside pattern.
+
+    ``namespace`` is an optional callable taking the same arguments as the
+    function and returning the version namespace its result belongs to.
+
+    With ``guard=True`` nothing is read back from the cache: the function runs
+    at most once per key and timeout, and repeat calls return None.
     """
     def decorator(func):
-        @functools.wraps(func)
+        # Everything that does not depend on the call arguments is resolved
+        # once here, so the wrapper only touches local names.
+        prefix = f"func_cache:{func.__name__}:"
+        func_name = func.__name__
+        cache_get = cache.get
+        cache_add = cache.add
+        # timeout=None means "never expire"; negative results still expire.
+        negative_timeout = NEGATIVE_CACHE_TIMEOUT if timeout is None else min(timeout, NEGATIVE_CACHE_TIMEOUT)
+
+        def passthrough(*args, **kwargs):
+            # A zero timeout would expire the entry immediately; skip the cache.
+            return func(*args, **kwargs)
+
+        def guard_wrapper(*args, **kwargs):
+            version = None
+            if namespace is not None:
+                version = namespace_version(namespace(*args, **kwargs))
+            key = generate_cache_key_with_prefix(prefix, args, kwargs, version)
+            # add() is atomic, so a single call both checks and claims the key.
+            if cache_add(key, _RUNNING, timeout=timeout):
+                return func(*args, **kwargs)
+            logger.debug("GUARDED: func=%s key=%s", func_name, key)
+            return None
+
         def wrapper(*args, **kwargs):
-            key = generate_cache_key(func, *args, **kwargs)
-            
-            # 1. Get from cache
-            result = cache.get(key)
-            if result is not None:
-                print(f"CACHE HIT: func='{func.__name__}' key='{key[:30]}...'")
-                return result
-            
-            print(f"CACHE MISS: func='{func.__name__}' key='{key[:30]}...'")
+            version = None
+            if namespace is not None:
+                version = namespace_version(namespace(*args, **kwargs))
+            key = generate_cache_key_with_prefix(prefix, args, kwargs, version)
+
+            # 1. Get from cache; _MISS tells "absent" apart from a cached None
+            result = cache_get(key, _MISS)
+            if result is not _MISS:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("CACHE HIT: func=%s key=%s", func_name, key)
+                return None if result is _NULL else result
+
+            logger.debug("CACHE MISS: func=%s key=%s", func_name, key)
             # 2. On miss, execute function
             result = func(*args, **kwargs)
-            
-            # 3. Set result in cache with time-based expiration
-            cache.set(key, result, timeout=timeout)
-            print(f"CACHE SET: func='{func.__name__}' key='{key[:30]}...'")
+
+            # 3. Store with add() so concurrent misses settle on one value.
+            # None (e.g. an unknown id) is cached as _NULL, but only briefly.
+            if result is None:
+                cache_add(key, _NULL, timeout=negative_timeout)
+            else:
+                cache_add(key, result, timeout=timeout)
             return result
+
+        if timeout == 0:
+            wrapper = passthrough
+        elif guard:
+            wrapper = guard_wrapper
+        # Only the attributes callers rely on; cheaper than functools.wraps.
+        wrapper.__name__ = func.__name__
+        wrapper.__qualname__ = func.__qualname__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
         return wrapper
     return decorator
 
 # --- Data Access Layer: data_access.py ---
 # A layer of simple functions responsible for DB interaction, decorated for caching.
 
-@cache_result(timeout=3600)  # Cache for 1 hour
+@cache_result(timeout=3600, namespace=lambda post_id: f"post:{post_id}")  # Cache for 1 hour
 def fetch_post(post_id: uuid.UUID) -> Post:
     """Fetches a single post from the database."""
     print(f"DATABASE: Fetching Post with id={post_id}")
@@ -97,31 +246,17 @@ def fetch_post(post_id: uuid.UUID) -> Post:
         return MOCK_DB['posts'][post_id]
     return None
 
-@cache_result(timeout=600)  # Cache for 10 minutes
+@cache_result(timeout=600, namespace=lambda user_id: f"user_posts:{user_id}")  # Cache for 10 minutes
 def fetch_active_posts_for_user(user_id: uuid.UUID) -> list[Post]:
     """Fetches all published posts for a given user."""
     print(f"DATABASE: Fetching posts for user_id={user_id}")
     time.sleep(0.2)
-    return [
-        p for p in MOCK_DB['posts'].values() 
-        if p.user_id == user_id and p.status == PostStatus.PUBLISHED
-    ]
-
-# --- Explicit Cache Invalidation ---
-def invalidate_cached_post(post_id: uuid.UUID):
-    """Invalidates the cache for a single post fetch."""
-    key = generate_cache_key(fetch_post, post_id=post_id)
-    print(f"INVALIDATION: Deleting key for fetch_post: {key[:30]}...")
-    cache.delete(key)
-
-def invalidate_cached_user_posts(user_id: uuid.UUID):
-    """Invalidates the cache for the user's post list."""
-    key = generate_cache_key(fetch_active_posts_for_user, user_id=user_id)
-    print(f"INVALIDATION: Deleting key for fetch_active_posts_for_user: {key[:30]}...")
-    cache.delete(key)
+    # Index lookup: O(matching posts) instead of a scan over every post.
+    post_ids = MOCK_DB['by_user_status'].get((user_id, PostStatus.PUBLISHED), ())
+    return [MOCK_DB['posts'][pid] for pid in post_ids]
 
 # --- Business Logic/Views: views.py ---
-# Views call the data access functions and explicitly invalidate caches on writes.
+# Views call the data access functions and bump version namespaces on writes.
 
 def get_post_detail(post_id: uuid.UUID):
     return fetch_post(post_id=post_id)
@@ -135,17 +270,21 @@ def update_post_title(post_id: uuid.UUID, user_id: uuid.UUID, new_title: str):
         print(f"\nDATABASE: Updating Post {post_id}")
         MOCK_DB['posts'][post_id].title = new_title
         
-        # Explicitly invalidate relevant caches
-        invalidate_cached_post(post_id)
-        invalidate_cached_user_posts(user_id)
+        # Bump the namespaces instead of deleting keys one by one, so new
+        # caches derived from a post need no changes here.
+        logger.debug("INVALIDATION: Bumping post:%s and user_posts:%s", post_id, user_id)
+        bump_namespace(f"post:{post_id}")
+        bump_namespace(f"user_posts:{user_id}")
         return MOCK_DB['posts'][post_id]
     return None
 
 if __name__ == '__main__':
+    logging.basicConfig(format='%(message)s')
+    logger.setLevel(logging.DEBUG)
     user_id_1 = uuid.uuid4()
     post_id_1 = uuid.uuid4()
     post_1 = Post(id=post_id_1, user_id=user_id_1, title="Decorators Rock", content="...", status=PostStatus.PUBLISHED)
-    MOCK_DB['posts'][post_id_1] = post_1
+    save_post(post_1)
 
     print("--- First request for post detail ---")
     get_post_detail(post_id_1)
@@ -1,19 +1,25 @@
 import uuid
 import datetime
 import enum
+import json
+import logging
 import time
 from unittest.mock import MagicMock
 
 # --- Django Framework Mock Setup ---
 from django.conf import settings
 from django.core.cache import caches
-from django.http import JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse
 
 if not settings.configured:
     settings.configure(
         CACHES={
             'default': {
-                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                # Stores live objects (no pickling) and skips key validation.
+                # Cached values are shared, so treat them as read-only and
+                # copy.copy() before mutating.
+                'BACKEND': 'lrucache_backend.LRUObjectCache',
                 'LOCATION': 'view-level-cache',
                 'TIMEOUT': 60 * 5, # 5 minute default
                 'OPTIONS': {
@@ -31,6 +37,7 @@ if not settings.configured:
     )
 
 cache = caches['default']
+logger = logging.getLogger(__name__)
 
 # --- Mock Database and Models ---
 MOCK_DB = {'posts': {}}
@@ -65,6 +72,13 @@ class PostManagerMock:
 
 Post.objects = PostManagerMock()
 
+def json_body(data) -> bytes:
+    """Serializes data the same way JsonResponse does, so it can be cached once."""
+    return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+def cached_json_response(body: bytes) -> HttpResponse:
+    return HttpResponse(body, content_type='application/json')
+
 # --- View Layer: views.py ---
 # This developer implements caching logic directly within the views for simplicity and explicitness.
 
@@ -73,43 +87,30 @@ def post_detail_view(request, post_id: uuid.UUID):
     # Define a simple, predictable cache key
     cache_key = f"view:post_detail:{post_id}"
     
-    # Cache-Aside: Step 1 - Check cache
-    cached_data = cache.get(cache_key)
-    if cached_data:
-        print(f"CACHE HIT for {cache_key}")
-        return JsonResponse(cached_data)
-    
-    print(f"CACHE MISS for {cache_key}")
-    # Cache-Aside: Step 2 - On miss, fetch from DB
-    try:
+    def build_body():
+        # Cache-Aside on miss: fetch from DB and encode the JSON body once
+        logger.debug("CACHE MISS for %s", cache_key)
         post = Post.objects.get(id=post_id)
-        post_data = post.to_dict()
-        
-        # Cache-Aside: Step 3 - Store in cache with time-based expiration
-        cache.set(cache_key, post_data, timeout=3600) # Cache for 1 hour
-        print(f"CACHE SET for {cache_key}")
-        
-        return JsonResponse(post_data)
+        return json_body(post.to_dict())
+
+    try:
+        # Single call for check + store; the cache holds the encoded body
+        body = cache.get_or_set(cache_key, build_body, timeout=3600) # Cache for 1 hour
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=404)
+    return cached_json_response(body)
 
 def user_posts_view(request, user_id: uuid.UUID):
     """A view that lists a user's posts, with caching."""
     cache_key = f"view:user_posts:{user_id}"
     
-    cached_list = cache.get(cache_key)
-    if cached_list is not None:
-        print(f"CACHE HIT for {cache_key}")
-        return JsonResponse({'posts': cached_list})
-        
-    print(f"CACHE MISS for {cache_key}")
-    posts = Post.objects.filter(user_id=user_id)
-    posts_data = [p.to_dict() for p in posts]
-    
-    cache.set(cache_key, posts_data, timeout=600) # Cache for 10 minutes
-    print(f"CACHE SET for {cache_key}")
-    
-    return JsonResponse({'posts': posts_data})
+    def build_body():
+        logger.debug("CACHE MISS for %s", cache_key)
+        posts = Post.objects.filter(user_id=user_id)
+        return json_body({'posts': [p.to_dict() for p in posts]})
+
+    body = cache.get_or_set(cache_key, build_body, timeout=600) # Cache for 10 minutes
+    return cached_json_response(body)
 
 def update_post_view(request, post_id: uuid.UUID):
     """A view that updates a post and performs explicit cache invalidation."""
@@ -126,15 +127,16 @@ def update_post_view(request, post_id: uuid.UUID):
         post_detail_key = f"view:post_detail:{post_id}"
         user_posts_key = f"view:user_posts:{post_to_update.user_id}"
         
-        print(f"INVALIDATION: Deleting keys: {post_detail_key}, {user_posts_key}")
-        cache.delete(post_detail_key)
-        cache.delete(user_posts_key)
+        logger.debug("INVALIDATION: Deleting keys: %s, %s", post_detail_key, user_posts_key)
+        cache.delete_many([post_detail_key, user_posts_key])
         
         return JsonResponse({'status': 'success', 'post': post_to_update.to_dict()})
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=404)
 
 if __name__ == '__main__':
+    logging.basicConfig(format='%(message)s')
+    logger.setLevel(logging.DEBUG)
     # Mock request object
     mock_request = MagicMock()
     
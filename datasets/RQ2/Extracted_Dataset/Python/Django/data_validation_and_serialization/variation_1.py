@@ -1,3 +1,4 @@
+import copy
 import os
 import sys
 import uuid
@@ -74,13 +75,26 @@ class Post(models.Model):
         return self.title
 
 # --- Custom Validators ---
+_PHONE_RE = re.compile(r'^\+1\d{10}$').match
+
 def validate_phone_number(value):
     """A simple validator for a US phone number format."""
-    if not re.match(r'^\+1\d{10}$', value):
+    if _PHONE_RE(value) is None:
         raise serializers.ValidationError("Phone number must be in the format +1XXXXXXXXXX.")
 
 # --- Serializers / DTOs ---
-class UserCreateSerializer(serializers.ModelSerializer):
+class CachedFieldsMixin:
+    """
+    Caches get_fields() per serializer class; each instance gets a deep copy,
+    since fields bind to their parent serializer.
+    """
+    def get_fields(self):
+        cls = type(self)
+        if '_field_template' not in cls.__dict__:
+            cls._field_template = super().get_fields()
+        return copy.deepcopy(cls._field_template)
+
+class UserCreateSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     # Non-model field for input validation
     phone_number = serializers.CharField(validators=[validate_phone_number], write_only=True)
     # Override email to add custom error message
@@ -101,7 +115,7 @@ class UserCreateSerializer(serializers.ModelSerializer):
         # validated_data['password_hash'] = make_password(validated_data['password_hash'])
         return User.objects.create(**validated_data)
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     user_id = serializers.UUIDField(source='user.id')
 
     class Meta:
@@ -184,8 +198,9 @@ if __name__ == '__main__':
     user_instance = User.objects.create(email='author@example.com', password_hash='...')
     post_instance = Post.objects.create(user=user_instance, title="My First Post", content="Hello world.")
     serializer = PostSerializer(instance=post_instance)
-    print(f"Serialized Post JSON: {serializer.data}")
-    assert 'user_id' in serializer.data
+    post_data = serializer.data
+    print(f"Serialized Post JSON: {post_data}")
+    assert 'user_id' in post_data
 
     # 4. Test Post Deserialization with context validation
     print("\n4. Testing Post validation with context...")
@@ -1,8 +1,9 @@
 import os
+import re
 import sys
 import uuid
 from datetime import datetime
-import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
 
 # --- Minimal Django & DRF Setup ---
 def setup_django():
@@ -52,6 +53,8 @@ class Post(models.Model):
     status = models.CharField(max_length=10, choices=PostStatus.choices, default=PostStatus.DRAFT)
 
 # --- Serializers / DTOs (Explicit Style) ---
+_SPAM_RE = re.compile(r'spam', re.IGNORECASE).search
+
 class UserDataTransferObject(serializers.Serializer):
     """
     A more explicit serializer, defining each field manually.
@@ -66,9 +69,17 @@ class UserDataTransferObject(serializers.Serializer):
 
     def validate_email(self, value):
         """Field-level validation for email."""
-        if "spam" in value.lower():
+        # Cheap in-memory check first; no lowercased copy of the value.
+        if _SPAM_RE(value):
             raise serializers.ValidationError("Email contains a forbidden word.")
-        if User.objects.filter(email=value).exists():
+        # Memoize the DB lookup in the serializer context so it runs once per
+        # request even if the same email is validated again. This is kept
+        # request-scoped on purpose: a process-wide cache would go stale as
+        # soon as the email is registered.
+        seen = self.context.setdefault('email_exists', {})
+        if value not in seen:
+            seen[value] = User.objects.filter(email=value).exists()
+        if seen[value]:
             raise serializers.ValidationError("An account with this email already exists.")
         return value
 
@@ -85,16 +96,24 @@ class UserDataTransferObject(serializers.Serializer):
         return instance
 
 # --- XML Generation Helper ---
+_ATTR_ENTITIES = {'"': '&quot;'}
+
 def generate_user_xml(user_data):
     """Converts a user data dictionary to an XML string."""
-    root = ET.Element("user")
+    # The <user> schema is flat and fixed, so the string is assembled directly
+    # rather than building and walking an ElementTree.
+    attrs = ''
+    parts = []
     for key, value in user_data.items():
         if key == 'id':
-            root.set('id', str(value))
+            attrs = f' id="{escape(str(value), _ATTR_ENTITIES)}"'
             continue
-        child = ET.SubElement(root, key)
-        child.text = str(value)
-    return ET.tostring(root, encoding='unicode')
+        text = escape(str(value))
+        # ElementTree self-closes elements with empty text; keep the same output.
+        parts.append(f'<{key}>{text}</{key}>' if text else f'<{key} />')
+    if not parts:
+        return f'<user{attrs} />'
+    return f'<user{attrs}>{"".join(parts)}</user>'
 
 # --- API Views ---
 class UserProfileView(APIView):
@@ -1,9 +1,22 @@
+import copy
 import os
+import re
 import sys
+import threading
+import time
 import uuid
 from datetime import datetime
-from xml.dom.minidom import parseString
-from dicttoxml import dicttoxml
+from xml.sax.saxutils import escape
+
+try:
+    from lxml import etree as ET
+except ImportError:
+    ET = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # --- Minimal Django & DRF Setup ---
 def setup_django():
@@ -21,10 +34,13 @@ def setup_django():
 setup_django()
 
 # --- Imports ---
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.signals import post_delete, post_save
 from django.http import HttpResponse
 from rest_framework import serializers, status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
 from rest_framework.test import APIRequestFactory
 
@@ -51,7 +67,42 @@ class Post(models.Model):
     content = models.TextField()
     status = models.CharField(max_length=10, choices=PostStatus.choices, default=PostStatus.DRAFT)
 
+# --- User Lookup Cache ---
+# Most posts come from a small set of active users, so the author row is kept
+# per process for a short TTL. Only the columns the endpoint reads are loaded.
+USER_CACHE_TTL = 30
+USER_CACHE_MAXSIZE = 1024
+_user_cache = {}  # user id -> (expires_at, user)
+_user_cache_lock = threading.Lock()
+
+def _get_user(user_id):
+    """Returns the User for ``user_id``; raises ValidationError/DoesNotExist."""
+    # Same coercion the model field applies; any malformed id, whatever its
+    # JSON type, surfaces as a ValidationError.
+    user_id = User._meta.pk.to_python(user_id)
+    now = time.monotonic()
+    with _user_cache_lock:
+        entry = _user_cache.get(user_id)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    user = User.objects.only('id', 'is_active').get(id=user_id)
+    with _user_cache_lock:
+        if len(_user_cache) >= USER_CACHE_MAXSIZE:
+            _user_cache.clear()
+        _user_cache[user_id] = (now + USER_CACHE_TTL, user)
+    return user
+
+def _evict_user(sender, instance, **kwargs):
+    with _user_cache_lock:
+        _user_cache.pop(instance.pk, None)
+
+post_save.connect(_evict_user, sender=User, dispatch_uid='evict_user_on_save')
+post_delete.connect(_evict_user, sender=User, dispatch_uid='evict_user_on_delete')
+
 # --- Validation Utilities ---
+# Case-insensitive search without making a lowercased copy of the content.
+_PLACEHOLDER_RE = re.compile(r'placeholder', re.IGNORECASE).search
+
 def validate_post_data(data, user):
     """
     A standalone validation function to separate logic from the view.
@@ -66,7 +117,7 @@ def validate_post_data(data, user):
     if not content:
         errors['content'] = 'Content cannot be empty.'
 
-    if data.get('status') == PostStatus.PUBLISHED and "placeholder" in content.lower():
+    if data.get('status') == PostStatus.PUBLISHED and _PLACEHOLDER_RE(content):
         errors['content'] = 'Cannot publish a post with placeholder content.'
 
     if not user.is_active:
@@ -74,8 +125,48 @@ def validate_post_data(data, user):
 
     return errors
 
+def _dict_to_lxml(root_tag, data):
+    """Builds a flat XML element tree from a serializer's data dict."""
+    root = ET.Element(root_tag)
+    SubElement = ET.SubElement
+    for key, value in data.items():
+        SubElement(root, key).text = '' if value is None else str(value)
+    return root
+
+def _fast_dict_to_xml(root_tag, data):
+    """Writes the same bytes as the lxml path for a flat dict, without lxml."""
+    parts = ["<?xml version='1.0' encoding='utf-8'?>\n"]
+    out = parts.append
+    if not data:
+        out(f'<{root_tag}/>\n')
+        return ''.join(parts).encode('utf-8')
+    out(f'<{root_tag}>\n')
+    for key, value in data.items():
+        text = escape('' if value is None else str(value))
+        out(f'  <{key}>{text}</{key}>\n')
+    out(f'</{root_tag}>\n')
+    return ''.join(parts).encode('utf-8')
+
+def render_xml(root_tag, data):
+    """Pretty-printed UTF-8 XML for a flat serializer dict."""
+    if ET is None:
+        return _fast_dict_to_xml(root_tag, data)
+    # Build the tree once and let libxml2 serialize it; no re-parse.
+    return ET.tostring(
+        _dict_to_lxml(root_tag, data),
+        pretty_print=True, xml_declaration=True, encoding='utf-8',
+    )
+
 # --- Serializers / DTOs ---
-class PostModelSerializer(serializers.ModelSerializer):
+class CachedFieldsMixin:
+    """Introspects the model once per class, then hands out deep copies."""
+    def get_fields(self):
+        cls = type(self)
+        if '_field_template' not in cls.__dict__:
+            cls._field_template = super().get_fields()
+        return copy.deepcopy(cls._field_template)
+
+class PostModelSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     # Type coercion: DRF handles converting UUID string from request to UUID object
     user_id = serializers.UUIDField(write_only=True)
 
@@ -88,16 +179,35 @@ class PostModelSerializer(serializers.ModelSerializer):
         # We'll inject it in the view
         return Post.objects.create(**validated_data)
 
+# --- JSON Renderer ---
+class ORJSONRenderer(BaseRenderer):
+    """orjson-backed JSON renderer; DRF's JSONRenderer stands in without orjson."""
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Already-serialized bodies are passed through untouched.
+        if isinstance(data, bytes):
+            return data
+        return orjson.dumps(data, default=str)
+
+if orjson is None:
+    ORJSONRenderer = JSONRenderer
+
 # --- API Views (Functional Style) ---
 @api_view(['POST'])
+@renderer_classes([ORJSONRenderer])
 def create_post_endpoint(request):
     """
     Creates a new post using a functional view.
     """
     try:
         # Type conversion from string UUID to User instance
-        user = User.objects.get(id=request.data.get('user_id'))
-    except (User.DoesNotExist, ValueError):
+        user = _get_user(request.data.get('user_id'))
+    except (User.DoesNotExist, ValidationError):
         return Response({"user_id": "Valid user_id is required."}, status=status.HTTP_400_BAD_REQUEST)
 
     # Use the external validation utility
@@ -110,14 +220,16 @@ def create_post_endpoint(request):
     if serializer.is_valid():
         # Inject the user instance into validated_data before saving
         serializer.save(user=user)
-        
+        # Each .data access wraps the representation in a fresh ReturnDict;
+        # take it once and reuse it for whichever format is rendered.
+        payload = serializer.data
+
         # XML Generation on demand
         if 'application/xml' in request.META.get('HTTP_ACCEPT', ''):
-            xml_output = dicttoxml(serializer.data, custom_root='post', attr_type=False)
-            pretty_xml = parseString(xml_output).toprettyxml()
+            pretty_xml = render_xml('post', payload)
             return HttpResponse(pretty_xml, content_type='application/xml', status=status.HTTP_201_CREATED)
 
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(payload, status=status.HTTP_201_CREATED)
     
     # Fallback for serializer's own validation
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
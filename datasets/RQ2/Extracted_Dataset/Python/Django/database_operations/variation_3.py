@@ -1,6 +1,5 @@
 import os
 import sys
-import uuid
 from datetime import datetime
 
 # --- Boilerplate for running Django models without a full project ---
@@ -43,6 +42,24 @@ from django.apps import AppConfig
 class DbOperationsV3AppConfig(AppConfig):
     name = 'db_operations_v3'
 
+# --- Database Connection Tuning ---
+from django.db.backends.signals import connection_created
+
+def _configure_sqlite(sender, connection, **kwargs):
+    """Applies per-connection SQLite pragmas as each connection is opened."""
+    # Skip in-memory databases; WAL and mmap only matter on disk.
+    if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+        return
+    with connection.cursor() as cursor:
+        # WAL + synchronous=NORMAL for cheap commits, plus 64 MiB cache and mmap.
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA cache_size=-65536')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.execute('PRAGMA mmap_size=268435456')
+
+connection_created.connect(_configure_sqlite, dispatch_uid='sqlite_pragmas')
+
 # --- Models (Schema Definition) ---
 from django.db import models
 from django.contrib.auth.hashers import make_password
@@ -51,7 +68,9 @@ class Role(models.Model):
     name = models.CharField(max_length=50, unique=True)
 
 class User(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Sequential 64-bit keys: inserts append to the end of the B-tree and the
+    # key (and every FK pointing at it) is 8 bytes instead of 16.
+    id = models.BigAutoField(primary_key=True)
     email = models.EmailField(unique=True)
     password_hash = models.CharField(max_length=128)
     roles = models.ManyToManyField(Role, related_name='users')
@@ -63,7 +82,7 @@ class Post(models.Model):
         DRAFT = 'DRAFT', 'Draft'
         PUBLISHED = 'PUBLISHED', 'Published'
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.BigAutoField(primary_key=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
     title = models.CharField(max_length=255)
     content = models.TextField()
@@ -73,19 +92,60 @@ class Post(models.Model):
 # This developer prefers simple, composable functions over classes for business logic.
 # Logic is grouped by domain in a "utils" or "queries" style.
 
+from concurrent.futures import ThreadPoolExecutor
+
 from django.db import transaction
 from django.db.models import Count
 
 # User-related functions
+# PBKDF2 runs inside OpenSSL's hashlib, which releases the GIL, so passwords
+# are hashed in parallel on one pool shared by every bulk registration.
+_hash_executor = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='pbkdf2')
+
+def _hash_passwords(passwords):
+    return list(_hash_executor.map(make_password, passwords))
+
 def create_user_account(email, password, role_names):
     user = User(email=email, password_hash=make_password(password))
-    user.save()
-    roles = Role.objects.filter(name__in=role_names)
-    user.roles.set(roles)
+    role_ids = list(Role.objects.filter(name__in=role_names).values_list('id', flat=True))
+    # A new user has no role links yet, so insert them directly rather than
+    # letting set() diff against an empty table.
+    Through = User.roles.through
+    with transaction.atomic():
+        user.save()
+        Through.objects.bulk_create(
+            [Through(user_id=user.id, role_id=role_id) for role_id in role_ids],
+            ignore_conflicts=True,
+        )
     return user
 
+def create_user_accounts(credentials, role_names):
+    """Bulk variant of create_user_account for (email, password) pairs."""
+    credentials = list(credentials)
+    password_hashes = _hash_passwords([password for _, password in credentials])
+    users = [
+        User(email=email, password_hash=password_hash)
+        for (email, _), password_hash in zip(credentials, password_hashes)
+    ]
+    role_ids = list(Role.objects.filter(name__in=role_names).values_list('id', flat=True))
+    Through = User.roles.through
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        Through.objects.bulk_create(
+            [Through(user_id=user.id, role_id=role_id) for user in users for role_id in role_ids],
+            ignore_conflicts=True,
+        )
+    return users
+
 def fetch_user_by_id(user_id):
-    return User.objects.filter(id=user_id).first()
+    # Plain PK lookup; first() would add an ORDER BY on top of the LIMIT.
+    try:
+        return User.objects.get(pk=user_id)
+    except User.DoesNotExist:
+        return None
+
+def user_exists(user_id):
+    return User.objects.filter(id=user_id).exists()
 
 def remove_user_account(user_id):
     user = fetch_user_by_id(user_id)
@@ -100,15 +160,22 @@ def create_new_post(user_id, title, content, is_published=False):
     return Post.objects.create(user_id=user_id, title=title, content=content, status=status)
 
 def update_post_content(post_id, new_title, new_content):
-    Post.objects.filter(id=post_id).update(title=new_title, content=new_content)
-    return Post.objects.get(id=post_id)
+    if not Post.objects.filter(id=post_id).update(title=new_title, content=new_content):
+        raise Post.DoesNotExist(f"Post {post_id} does not exist.")
+    # The new values are already known, so build the instance instead of
+    # SELECTing it back. Other fields are deferred and load on first access.
+    return Post.from_db(Post.objects.db, ['id', 'title', 'content'], [post_id, new_title, new_content])
 
 # Query functions
 def find_users_with_post_count():
-    return User.objects.annotate(post_count=Count('posts')).filter(post_count__gt=0)
+    # Callers only read email and post_count; also keeps the GROUP BY narrow.
+    return User.objects.annotate(post_count=Count('posts')).filter(post_count__gt=0).only('email')
 
 def find_published_posts_by_keyword(keyword):
-    return Post.objects.filter(status=Post.Status.PUBLISHED, content__icontains=keyword)
+    # JOIN the author in so reading post.user.email costs no extra query.
+    return Post.objects.filter(
+        status=Post.Status.PUBLISHED, content__icontains=keyword
+    ).select_related('user').only('title', 'user__email')
 
 # Transactional function
 @transaction.atomic
@@ -121,7 +188,12 @@ def register_user_with_welcome_post(email, password, role_names):
     if '@fail.com' in email:
         raise RuntimeError("Simulated failure during registration.")
     
-    create_new_post(new_user.id, "Welcome!", "Thanks for joining.", is_published=True)
+    # Goes through bulk_create rather than create()/save(): no per-instance
+    # save machinery or signals, and the same call takes a batch of welcome
+    # posts if sign-ups are ever registered together.
+    Post.objects.bulk_create([
+        Post(user_id=new_user.id, title="Welcome!", content="Thanks for joining.", status=Post.Status.PUBLISHED)
+    ])
     print(f"  - Transaction for {email} completed.")
     return new_user
 
@@ -132,8 +204,8 @@ if __name__ == '__main__':
     print("--- Variation 3: Functional/Procedural Demo ---")
 
     # Setup: Create Roles
-    Role.objects.get_or_create(name='ADMIN')
-    Role.objects.get_or_create(name='USER')
+    # One INSERT OR IGNORE; existing roles are left untouched
+    Role.objects.bulk_create([Role(name=name) for name in ('ADMIN', 'USER')], ignore_conflicts=True)
     print("Created roles: ADMIN, USER")
 
     # 1. CREATE
@@ -165,8 +237,8 @@ if __name__ == '__main__':
         register_user_with_welcome_post('user@fail.com', 'badpass', ['USER'])
     except RuntimeError as e:
         print(f"  - Caught expected error: {e}")
-        user_exists = User.objects.filter(email='user@fail.com').exists()
-        print(f"  - User 'user@fail.com' exists? {user_exists} (Should be False due to rollback)")
+        rollback_user_exists = User.objects.filter(email='user@fail.com').exists()
+        print(f"  - User 'user@fail.com' exists? {rollback_user_exists} (Should be False due to rollback)")
 
     print("\n[TRANSACTION] Attempting a successful transaction...")
     new_user = register_user_with_welcome_post('user2@example.com', 'pass2', ['USER'])
@@ -177,5 +249,4 @@ if __name__ == '__main__':
     print(f"\n[DELETE] Deleting user '{user1.email}'...")
     was_deleted = remove_user_account(user1.id)
     print(f"  - User deletion successful: {was_deleted}")
-    user_exists = fetch_user_by_id(user1.id) is not None
-    print(f"  - User exists after delete? {user_exists}")
\ No newline at end of file
+    print(f"  - User exists after delete? {user_exists(user1.id)}")
\ No newline at end of file
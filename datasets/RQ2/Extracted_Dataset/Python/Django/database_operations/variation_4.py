@@ -1,6 +1,5 @@
 import os
 import sys
-import uuid
 from datetime import datetime
 
 # --- Boilerplate for running Django models without a full project ---
@@ -43,7 +42,27 @@ from django.apps import AppConfig
 class DbOperationsV4AppConfig(AppConfig):
     name = 'db_operations_v4'
 
+# --- Database Connection Tuning ---
+from django.db.backends.signals import connection_created
+
+def _configure_sqlite(sender, connection, **kwargs):
+    """Applies per-connection SQLite pragmas as each connection is opened."""
+    # Only on-disk databases benefit.
+    if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+        return
+    with connection.cursor() as cursor:
+        # Fewer fsyncs per commit via WAL; bigger cache and mmap for reads.
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA cache_size=-65536')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.execute('PRAGMA mmap_size=268435456')
+
+connection_created.connect(_configure_sqlite, dispatch_uid='sqlite_pragmas')
+
 # --- Models (Schema Definition) ---
+from concurrent.futures import ThreadPoolExecutor
+
 from django.db import models, transaction
 from django.db.models import Q, Count
 from django.contrib.auth.hashers import make_password
@@ -68,22 +87,53 @@ class UserQuerySet(models.QuerySet):
     def annotate_post_count(self):
         return self.annotate(num_posts=Count('posts'))
 
+# PBKDF2 releases the GIL inside OpenSSL, so one shared pool hashes the
+# passwords of a bulk registration concurrently.
+_hash_executor = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='pbkdf2')
+
 class UserManager(models.Manager):
     def get_queryset(self):
         return UserQuerySet(self.model, using=self._db)
 
     def create_user_with_roles(self, email, password, role_names):
         user = self.model(email=email, password_hash=make_password(password))
-        user.save()
-        roles = Role.objects.filter(name__in=role_names)
-        user.roles.set(roles)
+        role_ids = list(Role.objects.filter(name__in=role_names).values_list('id', flat=True))
+        # A new user has no role links yet, so insert them directly rather
+        # than letting set() diff against an empty table.
+        Through = self.model.roles.through
+        with transaction.atomic(using=self.db):
+            user.save(using=self.db)
+            Through.objects.using(self.db).bulk_create(
+                [Through(user_id=user.id, role_id=role_id) for role_id in role_ids],
+                ignore_conflicts=True,
+            )
         return user
 
+    def bulk_create_users_with_roles(self, credentials, role_names):
+        """Bulk variant of create_user_with_roles for (email, password) pairs."""
+        credentials = list(credentials)
+        password_hashes = list(_hash_executor.map(make_password, [password for _, password in credentials]))
+        users = [
+            self.model(email=email, password_hash=password_hash)
+            for (email, _), password_hash in zip(credentials, password_hashes)
+        ]
+        role_ids = list(Role.objects.filter(name__in=role_names).values_list('id', flat=True))
+        Through = self.model.roles.through
+        with transaction.atomic(using=self.db):
+            self.bulk_create(users)
+            Through.objects.using(self.db).bulk_create(
+                [Through(user_id=user.id, role_id=role_id) for user in users for role_id in role_ids],
+                ignore_conflicts=True,
+            )
+        return users
+
     def active_admins(self):
         return self.get_queryset().active().with_role('ADMIN')
 
 class User(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Sequential 64-bit keys: inserts append to the end of the B-tree and the
+    # key (and every FK pointing at it) is 8 bytes instead of 16.
+    id = models.BigAutoField(primary_key=True)
     email = models.EmailField(unique=True)
     password_hash = models.CharField(max_length=128)
     roles = models.ManyToManyField(Role, related_name='users')
@@ -110,7 +160,7 @@ class Post(models.Model):
         DRAFT = 'DRAFT', 'Draft'
         PUBLISHED = 'PUBLISHED', 'Published'
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.BigAutoField(primary_key=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
     title = models.CharField(max_length=255)
     content = models.TextField()
@@ -125,9 +175,10 @@ if __name__ == '__main__':
     print("--- Variation 4: QuerySet-Centric Demo ---")
 
     # Setup: Create Roles
-    Role.objects.get_or_create(name='ADMIN')
-    Role.objects.get_or_create(name='USER')
-    Role.objects.get_or_create(name='EDITOR')
+    # One INSERT OR IGNORE; existing roles are left untouched
+    Role.objects.bulk_create(
+        [Role(name=name) for name in ('ADMIN', 'USER', 'EDITOR')], ignore_conflicts=True
+    )
     print("Created roles: ADMIN, USER, EDITOR")
 
     # 1. CREATE (using custom manager)
@@ -176,8 +227,12 @@ if __name__ == '__main__':
             raise InterruptedError("Simulated system failure")
     except InterruptedError as e:
         print(f"  - Transaction failed: {e}")
-        editor_exists = User.objects.filter(email=editor.email).exists()
-        newbie_exists = User.objects.filter(email='newbie@corp.com').exists()
+        # One lookup on the unique email index covers both checks.
+        found = set(
+            User.objects.filter(email__in=[editor.email, 'newbie@corp.com']).values_list('email', flat=True)
+        )
+        editor_exists = editor.email in found
+        newbie_exists = 'newbie@corp.com' in found
         print(f"  - Editor '{editor.email}' exists? {editor_exists} (Should be True due to rollback)")
         print(f"  - Newbie 'newbie@corp.com' exists? {newbie_exists} (Should be False due to rollback)")
 
@@ -3,6 +3,7 @@
 # Dependencies: pip install Django Pillow
 
 import csv
+import io
 import uuid
 import tempfile
 from datetime import datetime
@@ -10,7 +11,7 @@ from PIL import Image
 
 from django.db import models, transaction
 from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
-from django.core.files.base import ContentFile
+from django.core.files.base import File
 from django.core.files.storage import default_storage
 from django.shortcuts import render, redirect
 from django import forms
@@ -57,6 +58,9 @@ class Post(models.Model):
     content = models.TextField()
     status = models.CharField(max_length=10, choices=Status.choices, default=Status.DRAFT)
 
+# Status.values builds a new list on every access; imports test each row.
+_VALID_STATUSES = frozenset(Post.Status.values)
+
 # --- Forms (forms.py) ---
 class CsvUploadForm(forms.Form):
     csv_file = forms.FileField(label="Upload Posts CSV")
@@ -65,6 +69,10 @@ class ImageUploadForm(forms.Form):
     profile_image = forms.ImageField(label="Upload Profile Image")
 
 # --- Views (views.py) ---
+# Rows per INSERT when importing posts. Keeps memory bounded to one batch and
+# the statement well under SQLite's bound-parameter limit.
+POSTS_UPLOAD_BATCH_SIZE = 500
+
 @login_required
 def handle_posts_upload_view(request: HttpRequest) -> HttpResponse:
     """
@@ -74,29 +82,35 @@ def handle_posts_upload_view(request: HttpRequest) -> HttpResponse:
         form = CsvUploadForm(request.POST, request.FILES)
         if form.is_valid():
             uploaded_csv_file = request.FILES['csv_file']
-            
-            # Use a temporary file for potentially large uploads
-            with tempfile.NamedTemporaryFile(mode='w+', delete=True, suffix='.csv', newline='', encoding='utf-8') as temp_f:
-                # Stream content to temp file
-                for chunk in uploaded_csv_file.chunks():
-                    temp_f.write(chunk.decode('utf-8'))
-                temp_f.seek(0) # Rewind to the beginning of the file
+            uploaded_csv_file.seek(0)
 
+            # Decode the upload incrementally as csv reads it; Django has
+            # already spooled large uploads to disk, so no second copy is made.
+            text_stream = io.TextIOWrapper(uploaded_csv_file.file, encoding='utf-8', newline='')
+            try:
                 # Process the CSV
-                reader = csv.reader(temp_f)
+                reader = csv.reader(text_stream)
                 next(reader)  # Skip header row
 
-                posts_to_create = []
-                for row in reader:
-                    title, content, status_str = row
-                    if status_str.upper() in Post.Status.values:
-                        posts_to_create.append(
-                            Post(user=request.user, title=title, content=content, status=status_str.upper())
-                        )
-                
-                if posts_to_create:
-                    Post.objects.bulk_create(posts_to_create)
-            
+                # Stream rows into fixed-size batches, all in one transaction
+                # so the whole import is a single commit.
+                user = request.user
+                batch = []
+                with transaction.atomic():
+                    for row in reader:
+                        title, content, status_str = row
+                        status = status_str.upper()
+                        if status in _VALID_STATUSES:
+                            batch.append(Post(user=user, title=title, content=content, status=status))
+                            if len(batch) == POSTS_UPLOAD_BATCH_SIZE:
+                                Post.objects.bulk_create(batch)
+                                batch = []
+                    if batch:
+                        Post.objects.bulk_create(batch)
+            finally:
+                # Hand the file back to Django's upload handler to close.
+                text_stream.detach()
+
             return redirect('some_success_url')
     else:
         form = CsvUploadForm()
@@ -112,21 +126,26 @@ def handle_profile_image_upload_view(request: HttpRequest) -> HttpResponse:
         if form.is_valid():
             image_file = form.cleaned_data['profile_image']
             
-            # Open image with Pillow
+            # Open image with Pillow (lazily; nothing is decoded yet)
             img = Image.open(image_file)
             
-            # Resize logic
+            # Resize logic. For JPEGs, draft() makes libjpeg decode at the
+            # smallest 1/2, 1/4 or 1/8 scale that still covers the target, so
+            # the full-resolution bitmap is never built. thumbnail() would
+            # only draft down to twice the target; the DCT-scaled result is
+            # already good enough for a 256px avatar.
             target_size = (256, 256)
-            img.thumbnail(target_size)
+            img.draft('RGB', target_size)
+            img.thumbnail(target_size, reducing_gap=None)
             
-            # Save the processed image to a temporary in-memory file
-            temp_thumb = ContentFile(b'')
-            img.save(temp_thumb, format='JPEG')
-            temp_thumb.seek(0)
+            # Encode straight into a BytesIO and hand that stream to storage
+            # wrapped in a File; ContentFile would copy the bytes again.
+            buffer = io.BytesIO()
+            img.save(buffer, format='JPEG')
 
             # Save to user model
             current_user = request.user
-            current_user.profile_picture.save(f'{current_user.id}_avatar.jpg', temp_thumb, save=True)
+            current_user.profile_picture.save(f'{current_user.id}_avatar.jpg', File(buffer), save=True)
             
             return redirect('some_profile_url')
     else:
@@ -143,14 +162,21 @@ def download_posts_as_csv_view(request: HttpRequest) -> StreamingHttpResponse:
     """
     Streams a CSV file of all published posts.
     """
-    posts = Post.objects.filter(status=Post.Status.PUBLISHED).iterator()
+    # One JOINed query for exactly the three exported columns; rows come back
+    # as tuples ready for writerow, with no model instances and no per-row
+    # lookup of post.user.
+    rows = (
+        Post.objects.filter(status=Post.Status.PUBLISHED)
+        .values_list('title', 'content', 'user__email')
+        .iterator(chunk_size=2000)
+    )
     pseudo_buffer = Echo()
-    writer = csv.writer(pseudo_buffer)
+    writer = csv.writer(pseudo_buffer, lineterminator='\n')
 
     def row_generator():
-        yield writer.writerow(['Title', 'Content', 'Author Email'])
-        for post in posts:
-            yield writer.writerow([post.title, post.content, post.user.email])
+        yield writer.writerow(('Title', 'Content', 'Author Email'))
+        # The tuples go straight to the C writer; no per-row Python frame.
+        yield from map(writer.writerow, rows)
 
     response = StreamingHttpResponse(row_generator(), content_type="text/csv")
     response['Content-Disposition'] = f'attachment; filename="published_posts_{datetime.now().strftime("%Y%m%d")}.csv"'
@@ -2,6 +2,8 @@
 # For this self-contained example, we define everything in one file.
 #
 # File: myproject/settings.py (mocked)
+# File: middleware/bypass.py
+# File: middleware/request_id.py
 # File: middleware/request_logging.py
 # File: middleware/cors.py
 # File: middleware/rate_limit.py
@@ -11,6 +13,8 @@
 # File: manage.py (mocked runner)
 
 import logging
+import os
+import threading
 import time
 import json
 import uuid
@@ -20,6 +24,53 @@ from django.conf import settings
 from django.http import HttpRequest, JsonResponse, HttpResponse
 from django.core.cache import caches
 from django.core.exceptions import MiddlewareNotUsed, SuspiciousOperation
+from django.core.serializers.json import DjangoJSONEncoder
+
+# orjson parses and serializes in C and emits bytes directly; the stdlib is
+# the fallback when it is not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    json_loads = orjson.loads
+    # Non-str keys are stringified and dates, times and timedeltas are handed
+    # to DjangoJSONEncoder, so bodies match a stock JsonResponse.
+    _orjson_options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    _django_default = DjangoJSONEncoder().default
+
+    def json_dumps(obj):
+        return orjson.dumps(obj, default=_django_default, option=_orjson_options)
+else:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj, cls=DjangoJSONEncoder).encode()
+
+def json_error(body, status):
+    """Builds a JSON error response from pre-serialized ``body`` bytes."""
+    return HttpResponse(body, status=status, content_type='application/json')
+
+class FastJsonResponse(JsonResponse):
+    """
+    A JsonResponse whose body is encoded by json_dumps, i.e. by orjson when
+    it is installed, rather than by json.dumps with DjangoJSONEncoder.
+    """
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the "
+                "safe parameter to False."
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        # Bypass JsonResponse.__init__, which would encode the data again.
+        super(JsonResponse, self).__init__(content=json_dumps(data), **kwargs)
+
+# Constant error bodies are serialized once at import; a flood of rejected
+# requests then costs no encoding at all.
+RATE_LIMIT_BODY = json_dumps({'error': 'Rate limit exceeded'})
+SERVER_ERROR_BODY = json_dumps({'error': 'Server Error', 'details': 'An internal server error occurred.'})
 
 # --- Mock Django Environment Setup ---
 
@@ -39,8 +90,16 @@ class MockCache:
         return MOCK_CACHE_STORE.get(key, default)
     def set(self, key, value, timeout=None):
         MOCK_CACHE_STORE[key] = value
-    def incr(self, key):
-        MOCK_CACHE_STORE[key] = MOCK_CACHE_STORE.get(key, 0) + 1
+    def add(self, key, value, timeout=None):
+        if key in MOCK_CACHE_STORE:
+            return False
+        MOCK_CACHE_STORE[key] = value
+        return True
+    def incr(self, key, delta=1):
+        # Like Django's backends: a missing key is an error, not 0.
+        if key not in MOCK_CACHE_STORE:
+            raise ValueError(f"Key '{key}' not found")
+        MOCK_CACHE_STORE[key] += delta
         return MOCK_CACHE_STORE[key]
 
 caches.caches = {'default': MockCache()}
@@ -50,6 +109,8 @@ cache = caches['default']
 settings.configure(
     DEBUG=False,
     MIDDLEWARE=[
+        'middleware.bypass.BypassMiddleware',
+        'middleware.request_id.RequestIdMiddleware',
         'middleware.error_handling.ErrorHandlerMiddleware',
         'middleware.cors.CorsMiddleware',
         'middleware.rate_limit.RateLimitMiddleware',
@@ -57,6 +118,7 @@ settings.configure(
         'middleware.transformation.ResponseTransformationMiddleware',
     ],
     # Custom settings for our middleware
+    BYPASS_PATHS=['/healthz', '/readyz'],
     CORS_ALLOWED_ORIGINS=['https://example.com'],
     RATE_LIMIT_REQUESTS=100,
     RATE_LIMIT_WINDOW_SECONDS=60,
@@ -67,6 +129,50 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 
 # --- Middleware Implementations (Classic Class-Based) ---
 
+# File: middleware/bypass.py
+class BypassMiddleware:
+    """
+    Answers health-check paths before the rest of the chain runs, so probes
+    cost no rate-limit cache I/O, logging or header work.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # A tuple lets str.startswith() test every prefix in one C call.
+        self.bypass_paths = tuple(settings.BYPASS_PATHS)
+
+    def __call__(self, request):
+        if request.path.startswith(self.bypass_paths):
+            return HttpResponse(b'ok', content_type='text/plain')
+        return self.get_response(request)
+
+# File: middleware/request_id.py
+class RequestIdMiddleware:
+    """Tags each request with a random 128-bit hex ``request_id``."""
+    # IDs cut from each os.urandom() call, so the syscall is paid once per
+    # ID_BATCH requests instead of once per response.
+    ID_BATCH = 1024
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._ids = iter(())
+        self._refill_lock = threading.Lock()
+
+    def __call__(self, request):
+        request.request_id = self.next_id()
+        return self.get_response(request)
+
+    def next_id(self):
+        # next() on a list iterator is atomic, so only the refill is locked.
+        request_id = next(self._ids, None)
+        if request_id is None:
+            with self._refill_lock:
+                request_id = next(self._ids, None)
+                if request_id is None:
+                    pool = os.urandom(16 * self.ID_BATCH).hex()
+                    self._ids = iter([pool[i:i + 32] for i in range(0, len(pool), 32)])
+                    request_id = next(self._ids)
+        return request_id
+
 # File: middleware/request_logging.py
 class RequestLoggingMiddleware:
     def __init__(self, get_response):
@@ -74,35 +180,47 @@ class RequestLoggingMiddleware:
         self.logger = logging.getLogger(__name__)
 
     def __call__(self, request):
-        start_time = time.time()
-        self.logger.info(f"Request started: {request.method} {request.path}")
+        # isEnabledFor() is cached by logging; with INFO off there is no
+        # timing and no message formatting at all.
+        if not self.logger.isEnabledFor(logging.INFO):
+            return self.get_response(request)
+
+        start_ns = time.monotonic_ns()
+        self.logger.info("Request started: %s %s", request.method, request.path)
         
         response = self.get_response(request)
         
-        duration = time.time() - start_time
+        duration = (time.monotonic_ns() - start_ns) / 1e9
         self.logger.info(
-            f"Request finished: {request.method} {request.path} "
-            f"Status: {response.status_code} Duration: {duration:.4f}s"
+            "Request finished: %s %s Status: %s Duration: %.4fs",
+            request.method, request.path, response.status_code, duration,
         )
         return response
 
 # File: middleware/cors.py
 class CorsMiddleware:
+    # Constant preflight headers, handed to the response constructor as is.
+    PREFLIGHT_HEADERS = {
+        'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type, Authorization',
+    }
+
     def __init__(self, get_response):
         self.get_response = get_response
+        # Middleware is instantiated once when the handler chain is built, so
+        # settings are read here rather than on every request.
+        self.allowed_origins = frozenset(settings.CORS_ALLOWED_ORIGINS)
 
     def __call__(self, request):
         # Handle pre-flight requests
         if request.method == 'OPTIONS':
-            response = HttpResponse()
-            response['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-            response['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+            response = HttpResponse(headers=self.PREFLIGHT_HEADERS)
         else:
             response = self.get_response(request)
 
         # Add CORS headers to all responses
         origin = request.headers.get('Origin')
-        if origin in settings.CORS_ALLOWED_ORIGINS:
+        if origin in self.allowed_origins:
             response['Access-Control-Allow-Origin'] = origin
         
         return response
@@ -111,6 +229,8 @@ class CorsMiddleware:
 class RateLimitMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        self.max_requests = settings.RATE_LIMIT_REQUESTS
+        self.window_seconds = settings.RATE_LIMIT_WINDOW_SECONDS
 
     def __call__(self, request):
         # Use IP address for anonymous users, user ID for authenticated users
@@ -120,16 +240,27 @@ class RateLimitMiddleware:
             ip_address = request.META.get('REMOTE_ADDR', '127.0.0.1')
             key = f"ratelimit:{ip_address}"
 
-        request_count = cache.get(key, 0) + 1
+        request_count = self.hit(key)
         
-        if request_count > settings.RATE_LIMIT_REQUESTS:
-            return JsonResponse({'error': 'Rate limit exceeded'}, status=429)
-
-        cache.set(key, request_count, timeout=settings.RATE_LIMIT_WINDOW_SECONDS)
+        if request_count > self.max_requests:
+            return json_error(RATE_LIMIT_BODY, 429)
         
         response = self.get_response(request)
         return response
 
+    def hit(self, key):
+        """Atomically counts a request against ``key`` and returns the new count."""
+        # One round trip once the window exists. incr() keeps the key's TTL,
+        # so the window is fixed from its first request.
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # First request of the window. add() only succeeds for one caller;
+            # anyone who lost the race increments the key it created.
+            if cache.add(key, 1, timeout=self.window_seconds):
+                return 1
+            return cache.incr(key)
+
 # File: middleware/transformation.py
 class ResponseTransformationMiddleware:
     def __init__(self, get_response):
@@ -140,19 +271,30 @@ class ResponseTransformationMiddleware:
         
         # Only wrap JSON responses
         if isinstance(response, JsonResponse):
-            original_data = json.loads(response.content)
-            
-            # Don't re-wrap if already in the standard format
-            if 'data' in original_data or 'error' in original_data:
+            # Wrapped by an earlier pass; skip the parse entirely.
+            if response.get('X-Wrapped'):
                 return response
 
-            transformed_data = {
-                'status': 'success' if 200 <= response.status_code < 300 else 'error',
-                'data': original_data,
-                'request_id': str(uuid.uuid4())
-            }
-            response.content = json.dumps(transformed_data)
-            response['Content-Length'] = len(response.content)
+            content = response.content
+            
+            # Don't re-wrap if already in the standard format. Only a body
+            # that mentions "data" or "error" at all can be, so everything
+            # else skips the parse.
+            if b'"data"' in content or b'"error"' in content:
+                original_data = json_loads(content)
+                if 'data' in original_data or 'error' in original_data:
+                    return response
+
+            # The body is already valid JSON, so it is spliced into the
+            # envelope as bytes rather than decoded and encoded again.
+            # The ID comes from RequestIdMiddleware instead of a fresh uuid4().
+            status = b'success' if 200 <= response.status_code < 300 else b'error'
+            response.content = b''.join((
+                b'{"status":"', status, b'","data":', content,
+                b',"request_id":', json_dumps(getattr(request, 'request_id', None)), b'}',
+            ))
+            response['Content-Length'] = str(len(response.content))
+            response['X-Wrapped'] = '1'
         
         return response
 
@@ -161,20 +303,19 @@ class ErrorHandlerMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
         self.logger = logging.getLogger(__name__)
+        self.debug = settings.DEBUG
 
     def __call__(self, request):
         try:
             response = self.get_response(request)
         except SuspiciousOperation as e:
-            self.logger.warning(f"Suspicious operation: {e}")
-            return JsonResponse({'error': 'Bad Request', 'details': str(e)}, status=400)
+            self.logger.warning("Suspicious operation: %s", e)
+            return FastJsonResponse({'error': 'Bad Request', 'details': str(e)}, status=400)
         except Exception as e:
-            self.logger.exception(f"Unhandled exception for request {request.path}: {e}")
-            if settings.DEBUG:
-                error_details = str(e)
-            else:
-                error_details = 'An internal server error occurred.'
-            return JsonResponse({'error': 'Server Error', 'details': error_details}, status=500)
+            self.logger.exception("Unhandled exception for request %s: %s", request.path, e)
+            if not self.debug:
+                return json_error(SERVER_ERROR_BODY, 500)
+            return FastJsonResponse({'error': 'Server Error', 'details': str(e)}, status=500)
         
         return response
 
@@ -186,7 +327,7 @@ if __name__ == '__main__':
             raise ValueError("Simulated view error")
         if request.GET.get('suspicious'):
             raise SuspiciousOperation("Invalid characters in input")
-        return JsonResponse({'message': 'Hello, world!'})
+        return FastJsonResponse({'message': 'Hello, world!'})
 
     # Dynamically build the middleware chain from settings
     def build_middleware_chain(view_func):
@@ -15,6 +15,48 @@ from django.utils.module_loading import import_string
 from django.conf import settings
 from django.http import HttpRequest, JsonResponse, HttpResponse
 from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+
+# orjson parses and serializes in C and emits bytes directly; the stdlib is
+# the fallback when it is not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    json_loads = orjson.loads
+    # Same output as DjangoJSONEncoder: int/None dict keys become strings,
+    # and datetime/date/time (plus anything else non-native) use its default.
+    _orjson_options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    _django_default = DjangoJSONEncoder().default
+
+    def json_dumps(obj):
+        return orjson.dumps(obj, default=_django_default, option=_orjson_options)
+else:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj, cls=DjangoJSONEncoder).encode()
+
+def json_error(body, status):
+    """Builds a JSON error response from pre-serialized ``body`` bytes."""
+    return HttpResponse(body, status=status, content_type='application/json')
+
+class FastJsonResponse(JsonResponse):
+    """JsonResponse encoded with json_dumps instead of json.dumps + DjangoJSONEncoder."""
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the "
+                "safe parameter to False."
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        # JsonResponse.__init__ would serialize a second time; go to HttpResponse.
+        super(JsonResponse, self).__init__(content=json_dumps(data), **kwargs)
+
+# Serialized once at import; a flood of rejected requests costs no encoding.
+RATE_LIMIT_BODY = json_dumps({'error': 'Too many requests'})
 
 # --- Mock Django Environment Setup ---
 
@@ -31,6 +73,17 @@ class MockCache:
         return MOCK_CACHE_STORE.get(key, default)
     def set(self, key, value, timeout=None):
         MOCK_CACHE_STORE[key] = value
+    def add(self, key, value, timeout=None):
+        if key in MOCK_CACHE_STORE:
+            return False
+        MOCK_CACHE_STORE[key] = value
+        return True
+    def incr(self, key, delta=1):
+        # Like Django's backends: a missing key is an error, not 0.
+        if key not in MOCK_CACHE_STORE:
+            raise ValueError(f"Key '{key}' not found")
+        MOCK_CACHE_STORE[key] += delta
+        return MOCK_CACHE_STORE[key]
 
 caches.caches = {'default': MockCache()}
 cache = caches['default']
@@ -55,8 +108,23 @@ log = logging.getLogger(__name__)
 
 # File: myproject/middleware.py
 
+def count_hit(key, timeout):
+    """Atomically counts a request against ``key`` and returns the new count."""
+    # One round trip once the key exists; incr() leaves its TTL alone.
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # First request for the key. add() only succeeds for one caller;
+        # anyone who lost the race increments the key it created.
+        if cache.add(key, 1, timeout=timeout):
+            return 1
+        return cache.incr(key)
+
 def security_middleware(get_response):
     """Handles CORS and Rate Limiting."""
+    # Settings are read once, when the chain is built, not per request.
+    allowed_origins = frozenset(settings.CORS_ORIGIN_WHITELIST)
+    rate_limit = settings.RATE_LIMIT_PER_MINUTE
     
     def middleware(request):
         # Part 1: Rate Limiting
@@ -66,11 +134,10 @@ def security_middleware(get_response):
         )
         cache_key = f"rate-limit:{client_id}:{int(time.time() / 60)}"
         
-        count = cache.get(cache_key, 0) + 1
-        cache.set(cache_key, count, timeout=60)
+        count = count_hit(cache_key, 60)
 
-        if count > settings.RATE_LIMIT_PER_MINUTE:
-            return JsonResponse({'error': 'Too many requests'}, status=429)
+        if count > rate_limit:
+            return json_error(RATE_LIMIT_BODY, 429)
 
         # Part 2: CORS Handling
         if request.method == 'OPTIONS':
@@ -79,7 +146,7 @@ def security_middleware(get_response):
             response = get_response(request)
 
         origin = request.headers.get('Origin')
-        if origin in settings.CORS_ORIGIN_WHITELIST:
+        if origin in allowed_origins:
             response['Access-Control-Allow-Origin'] = origin
             response['Access-Control-Allow-Headers'] = 'Authorization, Content-Type'
             response['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
@@ -94,46 +161,67 @@ def logging_and_error_middleware(get_response):
 
     def middleware(request):
         request.correlation_id = str(uuid.uuid4())
-        start_ts = time.monotonic()
-        
-        log.info(f"REQ IN <{request.correlation_id}>: {request.method} {request.path}")
+        # isEnabledFor() is cached by logging; with INFO off the request is
+        # neither timed nor formatted.
+        log_info = log.isEnabledFor(logging.INFO)
+        if log_info:
+            start_ns = time.monotonic_ns()
+            log.info("REQ IN <%s>: %s %s", request.correlation_id, request.method, request.path)
 
         try:
             response = get_response(request)
         except Exception as e:
-            log.exception(f"ERR <{request.correlation_id}>: Unhandled exception: {e}")
+            log.exception("ERR <%s>: Unhandled exception: %s", request.correlation_id, e)
             error_payload = {
                 'error': 'Internal Server Error',
                 'correlation_id': request.correlation_id
             }
             if settings.DEBUG:
                 error_payload['details'] = str(e)
-            return JsonResponse(error_payload, status=500)
+            return FastJsonResponse(error_payload, status=500)
 
-        duration_ms = (time.monotonic() - start_ts) * 1000
-        log.info(f"RES OUT <{request.correlation_id}>: {response.status_code} in {duration_ms:.2f}ms")
+        if log_info:
+            duration_ms = (time.monotonic_ns() - start_ns) / 1e6
+            log.info("RES OUT <%s>: %s in %.2fms", request.correlation_id, response.status_code, duration_ms)
         
         return response
 
     return middleware
 
 
+class EnvelopeJsonResponse(FastJsonResponse):
+    """
+    A FastJsonResponse that keeps the data it was built from, so
+    api_envelope_middleware can wrap it without parsing the body back.
+    safe defaults to False: with the envelope the top level is always an object.
+    """
+    def __init__(self, data, safe=False, **kwargs):
+        super().__init__(data, safe=safe, **kwargs)
+        self.raw_data = data
+
+
 def api_envelope_middleware(get_response):
     """Wraps successful JSON responses in a standard envelope."""
 
     def middleware(request):
         response = get_response(request)
 
-        if isinstance(response, JsonResponse) and 200 <= response.status_code < 300:
+        if (isinstance(response, JsonResponse) and 200 <= response.status_code < 300
+                and not response.get('X-Wrapped')):
             try:
-                content = json.loads(response.content)
+                if isinstance(response, EnvelopeJsonResponse):
+                    content = response.raw_data
+                else:
+                    content = json_loads(response.content)
                 # Avoid double-wrapping
                 if 'data' not in content and 'meta' not in content:
-                    response.content = json.dumps({
+                    response.content = json_dumps({
                         'data': content,
                         'meta': {'request_id': getattr(request, 'correlation_id', None)}
                     })
-                    response['Content-Length'] = len(response.content)
+                    response['Content-Length'] = str(len(response.content))
+                    response['X-Wrapped'] = '1'
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError.
             except json.JSONDecodeError:
                 # Not a valid JSON response, pass through
                 pass
@@ -148,10 +236,10 @@ if __name__ == '__main__':
     # Mock a view
     def api_posts_view(request):
         if request.method == 'POST':
-            return JsonResponse({'id': str(uuid.uuid4()), 'title': 'New Post'}, status=201)
+            return EnvelopeJsonResponse({'id': str(uuid.uuid4()), 'title': 'New Post'}, status=201)
         if 'error' in request.GET:
             raise RuntimeError("A simulated error occurred in the view.")
-        return JsonResponse([{'id': str(uuid.uuid4()), 'title': 'First Post'}])
+        return EnvelopeJsonResponse([{'id': str(uuid.uuid4()), 'title': 'First Post'}])
 
     # Build the middleware chain
     handler = api_posts_view
@@ -16,6 +16,29 @@ from django.conf import settings
 from django.http import HttpRequest, JsonResponse, HttpResponse
 from django.core.cache import caches
 from django.core.exceptions import PermissionDenied
+from django.core.serializers.json import DjangoJSONEncoder
+
+# The envelope is decoded and encoded on every successful JSON response;
+# orjson does both in C and works on bytes. The stdlib is the fallback.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    json_loads = orjson.loads
+    # Raw view data may have non-str keys or datetimes; these options plus
+    # DjangoJSONEncoder's default keep the envelope identical to the stdlib path.
+    _orjson_options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    _django_default = DjangoJSONEncoder().default
+
+    def json_dumps(obj):
+        return orjson.dumps(obj, default=_django_default, option=_orjson_options)
+else:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
 
 # --- Mock Django Environment Setup ---
 
@@ -33,10 +56,16 @@ class MockCache:
         return MOCK_CACHE_STORE.get(key, default)
     def set(self, key, value, timeout=None):
         MOCK_CACHE_STORE[key] = value
-    def incr(self, key):
+    def add(self, key, value, timeout=None):
+        if key in MOCK_CACHE_STORE:
+            return False
+        MOCK_CACHE_STORE[key] = value
+        return True
+    def incr(self, key, delta=1):
+        # Like Django's backends: a missing key is an error, not 0.
         if key not in MOCK_CACHE_STORE:
-            MOCK_CACHE_STORE[key] = 0
-        MOCK_CACHE_STORE[key] += 1
+            raise ValueError(f"Key '{key}' not found")
+        MOCK_CACHE_STORE[key] += delta
         return MOCK_CACHE_STORE[key]
 
 caches.caches = {'default': MockCache()}
@@ -70,16 +99,43 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(name)s | %(messa
 # --- Middleware Implementation (Configurable Facade/Pipeline) ---
 
 # File: middleware/pipeline.py
+class PipelineJsonResponse(JsonResponse):
+    """
+    A JsonResponse that keeps the data it was built from, so the pipeline can
+    wrap it without parsing the body back.
+    """
+    def __init__(self, data, **kwargs):
+        super().__init__(data, **kwargs)
+        self.raw_data = data
+
+
 class ProcessingPipelineMiddleware:
     """
     An orchestrator middleware that delegates tasks to specialized handlers.
     Configuration is driven entirely by Django settings.
     """
+    # Rate limits are counted per fixed hour; the window is part of the key.
+    RATE_LIMIT_WINDOW = 3600
+
     def __init__(self, get_response):
         self.get_response = get_response
         self.config = settings.PROCESSING_PIPELINE_CONFIG
         self.logger = logging.getLogger(self.__class__.__name__)
 
+        # Resolve the config into plain attributes once; the hooks below run
+        # on every request and would otherwise repeat the nested lookups.
+        cors_config = self.config.get('CORS', {})
+        self._allowed_origins = frozenset(cors_config.get('ALLOWED_ORIGINS', []))
+        # Preflight responses always carry the same headers.
+        self._preflight_headers = {
+            'Access-Control-Allow-Methods': ', '.join(cors_config.get('ALLOWED_METHODS', [])),
+            'Access-Control-Allow-Headers': 'Content-Type, Authorization',
+        }
+        rate_limit_config = self.config.get('RATE_LIMIT', {})
+        self._user_limit = rate_limit_config.get('USER_REQUESTS_PER_HOUR', 1000)
+        self._anon_limit = rate_limit_config.get('ANON_REQUESTS_PER_HOUR', 100)
+        self._wrap_json = bool(self.config.get('RESPONSE_TRANSFORM', {}).get('WRAP_JSON'))
+
     def __call__(self, request):
         request.request_id = uuid.uuid4()
         self.logger.info(f"[{request.request_id}] Processing started: {request.method} {request.path}")
@@ -112,41 +168,50 @@ class ProcessingPipelineMiddleware:
         return response
 
     def _handle_cors_preflight(self, request):
-        response = HttpResponse(status=204)
-        config = self.config.get('CORS', {})
-        response['Access-Control-Allow-Methods'] = ', '.join(config.get('ALLOWED_METHODS', []))
-        response['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
-        return response
+        return HttpResponse(status=204, headers=self._preflight_headers)
 
     def _add_cors_headers(self, request, response):
-        config = self.config.get('CORS', {})
         origin = request.headers.get('Origin')
-        if origin in config.get('ALLOWED_ORIGINS', []):
+        if origin in self._allowed_origins:
             response['Access-Control-Allow-Origin'] = origin
         return response
 
     def _apply_rate_limit(self, request):
-        config = self.config.get('RATE_LIMIT', {})
+        # Each window gets its own key, so a counter never has to be reset:
+        # the next window simply starts counting a new key and the old one is
+        # left to expire.
+        bucket = int(time.time()) // self.RATE_LIMIT_WINDOW
         if request.user.is_authenticated:
-            key = f"rate_limit:user:{request.user.id}"
-            limit = config.get('USER_REQUESTS_PER_HOUR', 1000)
+            key = f"rate_limit:user:{request.user.id}:{bucket}"
+            limit = self._user_limit
         else:
             ip = request.META.get('REMOTE_ADDR', '127.0.0.1')
-            key = f"rate_limit:anon:{ip}"
-            limit = config.get('ANON_REQUESTS_PER_HOUR', 100)
+            key = f"rate_limit:anon:{ip}:{bucket}"
+            limit = self._anon_limit
         
-        count = cache.incr(key)
-        if count == 1:
-            cache.set(key, 1, timeout=3600) # Set expiry on first request
+        count = self._count_hit(key, timeout=self.RATE_LIMIT_WINDOW)
 
         if count > limit:
             raise PermissionDenied("Rate limit exceeded.")
 
+    def _count_hit(self, key, timeout):
+        # incr() is one atomic round trip and keeps the key's expiry; only the
+        # first request of a window falls through to add(), which creates the
+        # key with its TTL for exactly one caller.
+        try:
+            return cache.incr(key)
+        except ValueError:
+            if cache.add(key, 1, timeout=timeout):
+                return 1
+            return cache.incr(key)
+
     def _transform_response(self, request, response):
-        config = self.config.get('RESPONSE_TRANSFORM', {})
-        if config.get('WRAP_JSON') and isinstance(response, JsonResponse) and 200 <= response.status_code < 300:
+        if self._wrap_json and isinstance(response, JsonResponse) and 200 <= response.status_code < 300:
             try:
-                data = json.loads(response.content)
+                if isinstance(response, PipelineJsonResponse):
+                    data = response.raw_data
+                else:
+                    data = json_loads(response.content)
                 if 'payload' in data and 'meta' in data: # Avoid re-wrapping
                     return response
                 
@@ -157,8 +222,10 @@ class ProcessingPipelineMiddleware:
                         'request_id': str(request.request_id)
                     }
                 }
-                response.content = json.dumps(wrapped_data)
-                response['Content-Length'] = len(response.content)
+                response.content = json_dumps(wrapped_data)
+                # The content setter does not touch Content-Length.
+                response['Content-Length'] = str(len(response.content))
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError.
             except json.JSONDecodeError:
                 pass
         return response
@@ -170,7 +237,7 @@ if __name__ == '__main__':
     def get_user_posts_view(request, user_id):
         if 'error' in request.GET:
             raise Exception("Database connection failed")
-        return JsonResponse({'user_id': user_id, 'posts': [{'id': 1, 'title': 'My First Post'}]})
+        return PipelineJsonResponse({'user_id': user_id, 'posts': [{'id': 1, 'title': 'My First Post'}]})
 
     # Build the middleware chain
     handler = lambda req: get_user_posts_view(req, user_id='a_user_id')
@@ -199,7 +266,8 @@ if __name__ == '__main__':
     req_anon.user = User(id=None, is_authenticated=False)
     
     # Set cache to the limit
-    cache.set('rate_limit:anon:198.51.100.5', 100, timeout=3600)
+    bucket = int(time.time()) // ProcessingPipelineMiddleware.RATE_LIMIT_WINDOW
+    cache.set(f'rate_limit:anon:198.51.100.5:{bucket}', 100, timeout=3600)
 
     res_anon = handler(req_anon)
     print(f"Status: {res_anon.status_code}")
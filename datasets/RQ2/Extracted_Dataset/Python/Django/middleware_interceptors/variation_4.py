@@ -5,6 +5,9 @@
 # File: middleware/async_middleware.py
 # File: myapp/views.py (mocked)
 # File: manage.py (mocked runner)
+#
+# Serve through ASGI (django.core.asgi.get_asgi_application) on a uvloop
+# event loop, e.g. `uvicorn myproject.asgi:application --loop uvloop`.
 
 import logging
 import time
@@ -12,9 +15,55 @@ import json
 import uuid
 import asyncio
 from functools import reduce
+from asgiref.sync import markcoroutinefunction
 from django.utils.module_loading import import_string
 from django.conf import settings
 from django.http import HttpRequest, JsonResponse, HttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Encoding and decoding in C keep JSON work from holding up the event loop;
+# the stdlib is the fallback when orjson is not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    json_loads = orjson.loads
+    # Stringify non-str keys and let DjangoJSONEncoder format datetimes
+    # (millisecond precision, "Z" for UTC) and timedeltas, as JsonResponse does.
+    _orjson_options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    _django_default = DjangoJSONEncoder().default
+
+    def json_dumps(obj):
+        return orjson.dumps(obj, default=_django_default, option=_orjson_options)
+else:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj, cls=DjangoJSONEncoder).encode()
+
+class FastJsonResponse(JsonResponse):
+    """
+    JsonResponse serialized by json_dumps (orjson when available). Keeps the
+    data it was built from as ``raw_data`` so the envelope can be added
+    without parsing the body back.
+    """
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the "
+                "safe parameter to False."
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        # Skip JsonResponse.__init__ so the data is encoded only once.
+        super(JsonResponse, self).__init__(content=json_dumps(data), **kwargs)
+        self.raw_data = data
 
 # --- Mock Django Environment Setup ---
 
@@ -33,11 +82,19 @@ class MockAsyncCache:
     async def set(self, key, value, timeout=None):
         await asyncio.sleep(0.001)
         MOCK_CACHE_STORE[key] = value
+    async def add(self, key, value, timeout=None):
+        await asyncio.sleep(0.001)
+        if key in MOCK_CACHE_STORE:
+            return False
+        MOCK_CACHE_STORE[key] = value
+        return True
     async def incr(self, key):
         await asyncio.sleep(0.001)
-        val = MOCK_CACHE_STORE.get(key, 0) + 1
-        MOCK_CACHE_STORE[key] = val
-        return val
+        # Like Django's backends: a missing key is an error, not 0.
+        if key not in MOCK_CACHE_STORE:
+            raise ValueError(f"Key '{key}' not found")
+        MOCK_CACHE_STORE[key] += 1
+        return MOCK_CACHE_STORE[key]
 
 # This is a simplified mock. Django's cache setup is more complex.
 # We'll instantiate our mock directly in the middleware.
@@ -64,27 +121,30 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s [ASYNC] %(message)s'
 
 # File: middleware/async_middleware.py
 
-class AsyncErrorHandlingMiddleware:
+class AsyncMiddleware:
+    """
+    Base for the middleware below. They are async-only, so under ASGI Django
+    runs the chain natively on the event loop instead of adapting each layer
+    through a thread (sync_to_async).
+    """
+    sync_capable = False
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
-        # Check if get_response is async, and adapt if not
-        self.is_async = asyncio.iscoroutinefunction(self.get_response)
+        # Lets callers (and Django) see that calling this returns a coroutine.
+        markcoroutinefunction(self)
 
+class AsyncErrorHandlingMiddleware(AsyncMiddleware):
     async def __call__(self, request):
         try:
-            if self.is_async:
-                response = await self.get_response(request)
-            else:
-                response = self.get_response(request)
+            response = await self.get_response(request)
         except Exception as e:
             logging.error(f"Async middleware caught exception: {e}", exc_info=True)
-            return JsonResponse({"error": "An unexpected error occurred"}, status=500)
+            return FastJsonResponse({"error": "An unexpected error occurred"}, status=500)
         return response
 
-class AsyncCorsMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
-
+class AsyncCorsMiddleware(AsyncMiddleware):
     async def __call__(self, request):
         if request.method == 'OPTIONS':
             response = HttpResponse(status=204)
@@ -98,28 +158,41 @@ class AsyncCorsMiddleware:
             response['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
         return response
 
-class AsyncRateLimitMiddleware:
+class AsyncRateLimitMiddleware(AsyncMiddleware):
     def __init__(self, get_response):
-        self.get_response = get_response
+        super().__init__(get_response)
         self.cache = mock_async_cache # Use our async mock
 
     async def __call__(self, request):
         ip = request.META.get('REMOTE_ADDR', '127.0.0.1')
-        key = f"async_ratelimit:{ip}"
+        # Fixed windows keyed by their index: a new window is a new key, so
+        # counters are never reset and stale ones just expire.
+        bucket = int(time.time()) // settings.RATE_LIMIT_TIMEFRAME_SECONDS
+        key = f"async_ratelimit:{ip}:{bucket}"
         
-        count = await self.cache.incr(key)
-        if count == 1:
-            # In a real scenario, you'd use `set` with `nx=True` and `expire`
-            await self.cache.set(key, 1, timeout=settings.RATE_LIMIT_TIMEFRAME_SECONDS)
+        count = await self.hit(key)
 
         if count > settings.RATE_LIMIT_MAX_HITS:
-            return JsonResponse({'error': 'Rate limit exceeded'}, status=429)
+            return FastJsonResponse({'error': 'Rate limit exceeded'}, status=429)
         
         return await self.get_response(request)
 
-class AsyncLoggingAndTransformMiddleware:
+    async def hit(self, key):
+        """Atomically counts a request against ``key`` and returns the new count."""
+        # A single awaited round trip once the window exists; incr() keeps
+        # the key's TTL, and a later set() can no longer reset the counter.
+        try:
+            return await self.cache.incr(key)
+        except ValueError:
+            # First request of the window: only one add() wins, the rest
+            # increment the key it created.
+            if await self.cache.add(key, 1, timeout=settings.RATE_LIMIT_TIMEFRAME_SECONDS):
+                return 1
+            return await self.cache.incr(key)
+
+class AsyncLoggingAndTransformMiddleware(AsyncMiddleware):
     def __init__(self, get_response):
-        self.get_response = get_response
+        super().__init__(get_response)
         self.logger = logging.getLogger(self.__class__.__name__)
 
     async def __call__(self, request):
@@ -136,13 +209,17 @@ class AsyncLoggingAndTransformMiddleware:
         # Response Transformation
         if isinstance(response, JsonResponse) and 200 <= response.status_code < 300:
             try:
-                data = json.loads(response.content)
+                if isinstance(response, FastJsonResponse):
+                    data = response.raw_data
+                else:
+                    data = json_loads(response.content)
                 if 'data' not in data: # Avoid double wrapping
-                    response.content = json.dumps({
+                    response.content = json_dumps({
                         'data': data,
                         'request_id': request.id
                     })
-                    response['Content-Length'] = len(response.content)
+                    response['Content-Length'] = str(len(response.content))
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError.
             except json.JSONDecodeError:
                 pass # Not valid JSON, ignore
         
@@ -156,7 +233,7 @@ async def main():
         if 'crash' in request.GET:
             raise ValueError("Simulated async view crash")
         await asyncio.sleep(0.05) # Simulate async I/O (e.g., database call)
-        return JsonResponse([{'id': str(uuid.uuid4()), 'title': 'Async Post'}])
+        return FastJsonResponse([{'id': str(uuid.uuid4()), 'title': 'Async Post'}], safe=False)
 
     # Build the middleware chain
     handler = fetch_posts_view
@@ -206,7 +283,8 @@ async def main():
     req_rate.user = User(id=uuid.uuid4())
     
     # Set cache to the limit
-    await mock_async_cache.set('async_ratelimit:10.10.10.3', settings.RATE_LIMIT_MAX_HITS)
+    bucket = int(time.time()) // settings.RATE_LIMIT_TIMEFRAME_SECONDS
+    await mock_async_cache.set(f'async_ratelimit:10.10.10.3:{bucket}', settings.RATE_LIMIT_MAX_HITS)
 
     res_rate = await handler(req_rate)
     print(f"Status: {res_rate.status_code}")
@@ -214,4 +292,8 @@ async def main():
     print(f"Body: {json.loads(res_rate.content.decode())}\n")
 
 if __name__ == '__main__':
-    asyncio.run(main())
\ No newline at end of file
+    # uvloop's libuv-based loop when available, asyncio's default otherwise.
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file